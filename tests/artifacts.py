@@ -0,0 +1,187 @@
+import atexit
+import json
+import os
+import queue
+import re
+import threading
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from selenium.common.exceptions import WebDriverException
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_ROOT = "artifacts"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+INDEX_NAME = "index.jsonl"
+LOCK_NAME = "index.lock"
+
+# The three document levels of the deployed app: outer page, sandboxFrame and the form in userHtmlFrame
+FRAME_LEVELS = [("outer", []), ("sandbox", ["sandboxFrame"]), ("form", ["sandboxFrame", "userHtmlFrame"])]
+
+
+class ArtifactCollector:
+    """Failure-only debug artifacts, written off the test thread.
+
+    `capture` takes a screenshot, the DOM of each frame level and the browser console log;
+    everything the browser has to supply is read on the test thread, and the compressing and
+    writing happens on a background thread. Each capture becomes one zip under
+    <root>/<run>/, listed in <root>/index.jsonl by run and test ID. Once the artifacts exceed
+    `max_bytes`, the oldest are deleted. Parallel workers share the index, so appending to it
+    and evicting from it happen under a lock file."""
+
+    def __init__(self, root=DEFAULT_ROOT, run_id=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self.lock_path = os.path.join(root, LOCK_NAME)
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def capture(self, driver, test_id, reason=""):
+        files = {}
+        try:
+            files["screenshot.png"] = driver.get_screenshot_as_png()
+        except WebDriverException as e:
+            files["screenshot.error.txt"] = str(e).encode("utf-8")
+        for label, frames in FRAME_LEVELS:
+            try:
+                driver.switch_to.default_content()
+                for frame in frames:
+                    driver.switch_to.frame(frame)
+                files[f"dom_{label}.html"] = driver.page_source.encode("utf-8")
+            except WebDriverException as e:
+                # The deeper levels cannot be reached either
+                files[f"dom_{label}.error.txt"] = str(e).encode("utf-8")
+                break
+        try:
+            files["console.json"] = json.dumps(driver.get_log("browser"), indent=1).encode("utf-8")
+        except (WebDriverException, ValueError) as e:
+            files["console.error.txt"] = str(e).encode("utf-8")
+        self._start()
+        self.queue.put((test_id, reason, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), files))
+
+    def flush(self):
+        """Wait until every queued capture is on disk"""
+        if self._thread:
+            self.queue.join()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _writer(self):
+        while True:
+            job = self.queue.get()
+            try:
+                self._write(*job)
+            except OSError as e:
+                print(f"Could not write debug artifacts for {job[0]}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _write(self, test_id, reason, captured_at, files):
+        directory = os.path.join(self.root, self.run_id)
+        os.makedirs(directory, exist_ok=True)
+        name = re.sub(r"[^\w.-]+", "_", test_id) or "capture"
+        path = os.path.join(directory, f"{name}.zip")
+        attempt = 1
+        while os.path.exists(path):
+            attempt += 1
+            path = os.path.join(directory, f"{name}.{attempt}.zip")
+        with zipfile.ZipFile(path, "w") as archive:
+            for filename, data in files.items():
+                # PNG is already compressed; deflating it again only costs time
+                method = zipfile.ZIP_STORED if filename.endswith(".png") else zipfile.ZIP_DEFLATED
+                archive.writestr(filename, data, compress_type=method)
+        entry = {
+            "run": self.run_id, "test": test_id, "reason": reason, "captured_at": captured_at,
+            "path": os.path.relpath(path, self.root), "bytes": os.path.getsize(path), "files": sorted(files),
+        }
+        with self._index_lock():
+            with open(self.index_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry) + "\n")
+            self._evict(keep=entry["path"])
+
+    @contextmanager
+    def _index_lock(self):
+        # Without it, one worker's rewrite in _evict can drop the entries another worker just appended
+        with open(self.lock_path, "a+b") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+                else:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def entries(self, run=None, test=None):
+        """Index entries, oldest first, optionally for one run and/or test ID"""
+        try:
+            with open(self.index_path, encoding="utf-8") as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if (run is None or entry["run"] == run) and (test is None or entry["test"] == test):
+                entries.append(entry)
+        return entries
+
+    def _evict(self, keep):
+        entries = self.entries()
+        total = sum(entry["bytes"] for entry in entries)
+        if total <= self.max_bytes:
+            return
+        remaining = []
+        for entry in entries:
+            if total > self.max_bytes and entry["path"] != keep:
+                try:
+                    os.remove(os.path.join(self.root, entry["path"]))
+                except FileNotFoundError:
+                    pass
+                total -= entry["bytes"]
+            else:
+                remaining.append(entry)
+        temporary = f"{self.index_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.writelines(json.dumps(entry) + "\n" for entry in remaining)
+        os.replace(temporary, self.index_path)
+        for directory in {os.path.dirname(os.path.join(self.root, entry["path"])) for entry in entries}:
+            if os.path.isdir(directory) and not os.listdir(directory):
+                os.rmdir(directory)
+
+
+_shared_collector = None
+
+
+def get_collector():
+    """Process-wide collector configured by ATTENDANCE_ARTIFACTS_DIR, ATTENDANCE_ARTIFACTS_MAX_MB and ATTENDANCE_RUN_ID"""
+    global _shared_collector
+    if _shared_collector is None:
+        _shared_collector = ArtifactCollector(
+            root=os.environ.get("ATTENDANCE_ARTIFACTS_DIR", DEFAULT_ROOT),
+            run_id=os.environ.get("ATTENDANCE_RUN_ID"),
+            max_bytes=int(float(os.environ.get("ATTENDANCE_ARTIFACTS_MAX_MB", DEFAULT_MAX_BYTES / 1024 / 1024)) * 1024 * 1024),
+        )
+    return _shared_collector
@@ -0,0 +1,330 @@
+#cd tests
+#python attendance_analytics.py roster --state roster_analytics.json --out roster_analytics
+import argparse
+import csv
+import gc
+import glob
+import gzip
+import hashlib
+import io
+import json
+import os
+import time
+from collections import Counter
+from functools import lru_cache
+from itertools import compress, repeat
+from operator import is_, is_not, itemgetter, lt
+
+CHUNK_BYTES = 8 * 1024 * 1024
+STATE_VERSION = 2
+DIGEST_BYTES = 4096
+
+# Columns the rollups need, from the TEST_STUDENTS / exported Sheet schema; Name is optional
+REQUIRED_COLUMNS = ["Date", "Email", "Login", "Logout"]
+
+DAILY_FIELDS = ["Date", "People", "Sessions", "Hours", "Hours Per Person", "Late", "Unmatched Sign-ins"]
+PEOPLE_FIELDS = ["Email", "Name", "Days", "Sessions", "Hours", "Hours Per Day", "Late", "Unmatched Sign-ins",
+                 "First Date", "Last Date"]
+
+# Per-day and per-person state, stored as lists to keep the state file small
+DAY_PEOPLE, DAY_SESSIONS, DAY_MINUTES, DAY_LATE, DAY_UNMATCHED = range(5)
+(PERSON_NAME, PERSON_DAYS, PERSON_SESSIONS, PERSON_MINUTES, PERSON_LATE, PERSON_UNMATCHED,
+ PERSON_FIRST, PERSON_LAST) = range(8)
+
+
+@lru_cache(maxsize=100000)
+def parse_clock(value):
+    """Minutes after midnight for "HH:MM", "HH:MM:SS" or "h:mm[:ss] AM/PM"; None if blank or unreadable"""
+    text = value.strip().upper()
+    suffix = text[-2:] if text.endswith(("AM", "PM")) else ""
+    parts = text[:len(text) - len(suffix)].strip().split(":")
+    try:
+        hours, minutes = int(parts[0]), int(parts[1])
+        seconds = float(parts[2]) if len(parts) == 3 else 0.0
+    except (ValueError, IndexError):
+        return None
+    if suffix:
+        if not 1 <= hours <= 12:
+            return None
+        hours = hours % 12 + (12 if suffix == "PM" else 0)
+    if len(parts) > 3 or not (0 <= hours < 24 and 0 <= minutes < 60 and 0 <= seconds < 60):
+        return None
+    return hours * 60 + minutes + seconds / 60
+
+
+def read_chunks(path, offset=0, chunk_bytes=CHUNK_BYTES):
+    """Yield (header, rows, end_offset) for the complete CSV records in `path` past byte `offset`.
+
+    Chunks end on a line break outside quotes, so a multi-line quoted field is never split. Text
+    after the last line break (Sheets downloads have none) is a record if its quotes are closed
+    and it has every header column; anything shorter is taken as partly written and left for the
+    next run."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as file:
+        header = next(csv.reader([file.readline().decode("utf-8-sig")]), [])
+        position = max(offset, file.tell())
+        file.seek(position)
+        pending = b""
+        while True:
+            data = file.read(chunk_bytes)
+            if not data:
+                break
+            data = pending + data
+            end = data.rfind(b"\n") + 1
+            while end and data.count(b'"', 0, end) % 2:
+                end = data.rfind(b"\n", 0, end - 1) + 1
+            pending = data[end:]
+            if not end:
+                continue
+            rows = [row for row in csv.reader(io.StringIO(data[:end].decode("utf-8"), newline="")) if row]
+            position += end
+            yield header, rows, position
+        if pending.strip() and not pending.count(b'"') % 2:
+            try:
+                rows = list(csv.reader(io.StringIO(pending.decode("utf-8"), newline="")))
+            except UnicodeDecodeError:
+                return
+            if len(rows) == 1 and len(rows[0]) >= len(header):
+                yield header, rows, position + len(pending)
+
+
+def _digest(path, start=0, length=DIGEST_BYTES):
+    # Identifies a file across runs, so a replaced or edited export is not resumed at a stale offset
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as file:
+        file.seek(start)
+        return hashlib.sha1(file.read(length)).hexdigest()
+
+
+def _tail_digest(path, offset):
+    # The bytes just before the offset; an edit to an earlier row (a sign-out filling in its
+    # Logout cell) shifts them, even when the start of the file is unchanged
+    start = max(offset - DIGEST_BYTES, 0)
+    return _digest(path, start, offset - start)
+
+
+class AttendanceAnalytics:
+    """Streaming per-day and per-person rollups over attendance exports.
+
+    Files are read in chunks of whole records and each chunk is split into columns, so memory
+    stays at one chunk plus the rollups. Exports are treated as append-only: with a state file,
+    a re-run resumes every file at the byte offset where the last run stopped. Rows are expected
+    in date order per person, as the Sheet appends them."""
+
+    def __init__(self, start_time="09:00", grace_minutes=0):
+        self.start_time = start_time
+        self.grace_minutes = grace_minutes
+        self.late_after = parse_clock(start_time) + grace_minutes
+        self.files = {}
+        self.days = {}
+        self.people = {}
+        self.rows = 0
+        self.skipped = 0
+
+    def settings(self):
+        return {"start_time": self.start_time, "grace_minutes": self.grace_minutes}
+
+    @classmethod
+    def load(cls, path, start_time="09:00", grace_minutes=0):
+        """Resume from a state file; starts empty if there is none or it used other settings"""
+        analytics = cls(start_time, grace_minutes)
+        try:
+            with open(path) as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return analytics
+        if state.get("version") != STATE_VERSION or state.get("settings") != analytics.settings():
+            return analytics
+        analytics.files = state["files"]
+        analytics.days = state["days"]
+        analytics.people = state["people"]
+        analytics.rows = state["rows"]
+        analytics.skipped = state["skipped"]
+        return analytics
+
+    def save(self, path):
+        state = {
+            "version": STATE_VERSION, "settings": self.settings(), "files": self.files,
+            "days": self.days, "people": self.people, "rows": self.rows, "skipped": self.skipped,
+        }
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(state, file, separators=(",", ":"))
+        os.replace(temporary, path)
+
+    def needs_rebuild(self, paths):
+        """True if a file seen before has been replaced, truncated or edited before the resume offset"""
+        for path in paths:
+            seen = self.files.get(os.path.abspath(path))
+            if not seen:
+                continue
+            if (os.path.getsize(path) < seen["size"] or _digest(path) != seen["head"]
+                    or _tail_digest(path, seen["offset"]) != seen["tail"]):
+                return True
+        return False
+
+    def update(self, paths, chunk_bytes=CHUNK_BYTES):
+        """Process the rows added to `paths` since the last update; returns the number of new rows"""
+        before = self.rows
+        for path in paths:
+            self.process_file(path, chunk_bytes)
+        return self.rows - before
+
+    def process_file(self, path, chunk_bytes=CHUNK_BYTES):
+        key = os.path.abspath(path)
+        seen = self.files.get(key, {"offset": 0})
+        offset = seen["offset"]
+        if path.endswith(".gz") and offset and seen.get("size") == os.path.getsize(path):
+            # Compressed parts are written once; skip them instead of decompressing up to the offset
+            return
+        # The chunks hold no reference cycles, and collector passes over them cost about a fifth of the run
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for header, rows, offset in read_chunks(path, offset, chunk_bytes):
+                self.add_rows(header, rows)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        self.files[key] = {
+            "offset": offset, "size": os.path.getsize(path), "head": _digest(path), "tail": _tail_digest(path, offset),
+        }
+
+    def add_rows(self, header, rows):
+        missing = [name for name in REQUIRED_COLUMNS if name not in header]
+        if missing:
+            raise ValueError(f"Export is missing columns: {', '.join(missing)}")
+        indexes = [header.index(name) for name in REQUIRED_COLUMNS]
+        indexes.append(header.index("Name") if "Name" in header else indexes[1])
+        width = max(indexes) + 1
+        if rows and min(map(len, rows)) < width:
+            complete = [row for row in rows if len(row) >= width]
+            self.skipped += len(rows) - len(complete)
+            rows = complete
+        dates, emails, logins, logouts, names = (list(map(itemgetter(index), rows)) for index in indexes)
+        self.add_columns(dates, emails, names, list(map(parse_clock, logins)), list(map(parse_clock, logouts)))
+
+    def add_columns(self, dates, emails, names, logins, logouts):
+        """Fold one chunk of columns (logins/logouts already in minutes, None if blank) into the rollups.
+
+        Session, late and unmatched counts come from Counter over the columns; only the minute
+        totals and person-days need a loop in Python."""
+        usable = list(map(all, zip(dates, emails, map(is_not, logins, repeat(None)))))
+        if not all(usable):
+            self.skipped += usable.count(False)
+            dates, emails, names, logins, logouts = (
+                list(compress(column, usable)) for column in (dates, emails, names, logins, logouts)
+            )
+        if not dates:
+            return
+        days, people = self.days, self.people
+        late = list(map(lt, repeat(self.late_after), logins))
+        unmatched = list(map(is_, logouts, repeat(None)))
+        for day in set(dates):
+            if day not in days:
+                days[day] = [0, 0, 0.0, 0, 0]
+
+        # Minute totals and person-days; a person's days are counted as their date changes
+        for day, email, name, login, logout in zip(dates, emails, names, logins, logouts):
+            person = people.get(email)
+            if person is None:
+                person = people[email] = [name, 0, 0, 0.0, 0, 0, day, ""]
+            if person[PERSON_LAST] != day:
+                person[PERSON_LAST] = day
+                person[PERSON_DAYS] += 1
+                days[day][DAY_PEOPLE] += 1
+            if logout is not None:
+                # A sign-out earlier than the sign-in ran past midnight
+                minutes = logout - login if logout >= login else logout + 1440 - login
+                person[PERSON_MINUTES] += minutes
+                days[day][DAY_MINUTES] += minutes
+
+        for stats, index, counts in (
+            (days, DAY_SESSIONS, Counter(dates)),
+            (days, DAY_LATE, Counter(compress(dates, late))),
+            (days, DAY_UNMATCHED, Counter(compress(dates, unmatched))),
+            (people, PERSON_SESSIONS, Counter(emails)),
+            (people, PERSON_LATE, Counter(compress(emails, late))),
+            (people, PERSON_UNMATCHED, Counter(compress(emails, unmatched))),
+        ):
+            for key, count in counts.items():
+                stats[key][index] += count
+        self.rows += len(dates)
+
+    def daily_rows(self):
+        for day in sorted(self.days):
+            people, sessions, minutes, late, unmatched = self.days[day]
+            yield [day, people, sessions, round(minutes / 60, 2), round(minutes / 60 / people, 2), late, unmatched]
+
+    def people_rows(self):
+        for email in sorted(self.people):
+            name, days, sessions, minutes, late, unmatched, first, last = self.people[email]
+            yield [email, name, days, sessions, round(minutes / 60, 2), round(minutes / 60 / days, 2), late,
+                   unmatched, first, last]
+
+    def write_csv(self, prefix):
+        """Write {prefix}_daily.csv and {prefix}_people.csv; returns both paths"""
+        paths = []
+        for suffix, fields, rows in (("daily", DAILY_FIELDS, self.daily_rows()),
+                                     ("people", PEOPLE_FIELDS, self.people_rows())):
+            path = f"{prefix}_{suffix}.csv"
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(fields)
+                writer.writerows(rows)
+            paths.append(path)
+        return paths
+
+
+def expand_paths(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.csv")) + glob.glob(os.path.join(path, "*.csv.gz"))))
+        else:
+            files.append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-day and per-person attendance rollups over exported CSVs")
+    parser.add_argument("paths", nargs="+", help="Exported CSV files (.csv/.csv.gz) or directories of them")
+    parser.add_argument("--start-time", default="09:00", help="Sign-ins after this time count as late")
+    parser.add_argument("--grace", type=int, default=0, help="Minutes after the start time before a sign-in is late")
+    parser.add_argument("--state", help="State file; re-runs only process rows appended since the last run")
+    parser.add_argument("--full", action="store_true", help="Ignore the state file and process everything")
+    parser.add_argument("--out", help="Write <out>_daily.csv and <out>_people.csv")
+    parser.add_argument("--chunk-mb", type=float, default=CHUNK_BYTES / 1024 / 1024)
+    args = parser.parse_args()
+
+    paths = expand_paths(args.paths)
+    analytics = AttendanceAnalytics(args.start_time, args.grace)
+    if args.state and not args.full:
+        analytics = AttendanceAnalytics.load(args.state, args.start_time, args.grace)
+        if analytics.needs_rebuild(paths):
+            print("An export was replaced or edited since the last run; processing everything")
+            analytics = AttendanceAnalytics(args.start_time, args.grace)
+
+    start_time = time.perf_counter()
+    new_rows = analytics.update(paths, int(args.chunk_mb * 1024 * 1024))
+    elapsed = time.perf_counter() - start_time
+    if args.state:
+        analytics.save(args.state)
+    incomplete = [path for path in paths if not path.endswith(".gz")
+                  and analytics.files[os.path.abspath(path)]["offset"] < os.path.getsize(path)]
+    if incomplete:
+        print(f"Left an incomplete last line for the next run in: {', '.join(incomplete)}")
+
+    late = sum(day[DAY_LATE] for day in analytics.days.values())
+    unmatched = sum(day[DAY_UNMATCHED] for day in analytics.days.values())
+    print(f"Processed {new_rows} new rows from {len(paths)} files in {elapsed:.2f}s"
+          + (f" ({new_rows / elapsed:,.0f} rows/s)" if new_rows and elapsed else ""))
+    print(f"Totals: {analytics.rows} sessions, {len(analytics.days)} days, {len(analytics.people)} people, "
+          f"{late} late arrivals, {unmatched} unmatched sign-ins, {analytics.skipped} rows skipped")
+    if args.out:
+        for path in analytics.write_csv(args.out):
+            print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import NoSuchFrameException, WebDriverException
+from perf_stats import summarize
+
+CLEAR_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}
+return window.location.origin;
+"""
+
+# The app's three documents; the form's storage lives on the iframes' origins, not the outer page's
+FRAME_PATHS = [[], ["sandboxFrame"], ["sandboxFrame", "userHtmlFrame"]]
+
+
+def chrome_options(headless=True, window_size="1920,1080"):
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument(f"--window-size={window_size}")
+    # Lets failure artifacts include the browser console
+    options.set_capability("goog:loggingPrefs", {"browser": "ALL"})
+    return options
+
+
+class DriverPool:
+    """Pre-launched Chrome sessions that test classes lease instead of starting their own.
+
+    Drivers launch on background threads as soon as the pool starts, so the first lease
+    only waits for one browser and later leases find a warm session. Launch, first-navigation,
+    lease-wait and reset times are recorded for `report()`."""
+
+    def __init__(self, size=1, headless=True, window_size="1920,1080"):
+        self.size = size
+        self.headless = headless
+        self.window_size = window_size
+        self.idle = queue.Queue()
+        self.drivers = []
+        self.navigated = set()
+        self.timings = {"launch": [], "first_navigation": [], "lease_wait": [], "reset": []}
+        self.lock = threading.Lock()
+        self.started = False
+
+    def start(self):
+        with self.lock:
+            if self.started:
+                return self
+            self.started = True
+        for _ in range(self.size):
+            threading.Thread(target=self._launch, daemon=True).start()
+        return self
+
+    def _launch(self):
+        start_time = time.perf_counter()
+        try:
+            driver = webdriver.Chrome(options=chrome_options(self.headless, self.window_size))
+        except WebDriverException as e:
+            # Hand the failure to whoever is waiting for a lease rather than losing it on this thread
+            self.idle.put(e)
+            return
+        self._record("launch", time.perf_counter() - start_time)
+        with self.lock:
+            self.drivers.append(driver)
+        self.idle.put(driver)
+
+    def lease(self, timeout=120):
+        self.start()
+        start_time = time.perf_counter()
+        try:
+            driver = self.idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No WebDriver session became available within {timeout}s")
+        if isinstance(driver, Exception):
+            raise driver
+        self._record("lease_wait", time.perf_counter() - start_time)
+        return driver
+
+    def navigate(self, driver, url):
+        """driver.get(url), timing the first navigation each session makes"""
+        start_time = time.perf_counter()
+        driver.get(url)
+        with self.lock:
+            first = id(driver) not in self.navigated
+            self.navigated.add(id(driver))
+        if first:
+            self._record("first_navigation", time.perf_counter() - start_time)
+
+    def release(self, driver):
+        """Clear cookies and storage, then return the session to the pool (or quit it if it is broken)"""
+        start_time = time.perf_counter()
+        try:
+            self._clear_storage(driver)
+            driver.delete_all_cookies()
+            # delete_all_cookies only covers the current domain; the iframes live on other origins
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.get("about:blank")
+        except WebDriverException:
+            with self.lock:
+                if driver in self.drivers:
+                    self.drivers.remove(driver)
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+            threading.Thread(target=self._launch, daemon=True).start()
+            return
+        self._record("reset", time.perf_counter() - start_time)
+        self.idle.put(driver)
+
+    def _clear_storage(self, driver):
+        origins = set()
+        for path in FRAME_PATHS:
+            driver.switch_to.default_content()
+            try:
+                for frame in path:
+                    driver.switch_to.frame(frame)
+            except NoSuchFrameException:
+                # Not on the app's pages; the deeper frames are missing as well
+                break
+            origins.add(driver.execute_script(CLEAR_STORAGE_SCRIPT))
+        driver.switch_to.default_content()
+        # sessionStorage is only reachable from script; this covers IndexedDB, caches and the rest
+        for origin in sorted(origin for origin in origins if origin and origin != "null"):
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+
+    def shutdown(self):
+        with self.lock:
+            drivers, self.drivers = self.drivers, []
+            self.navigated.clear()
+            self.started = False
+            self.idle = queue.Queue()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+
+    def _record(self, name, elapsed):
+        with self.lock:
+            self.timings[name].append(elapsed)
+
+    def report(self):
+        return {name: summarize(values) for name, values in self.timings.items() if values}
+
+
+_shared_pool = None
+
+
+def get_pool():
+    """Process-wide pool; ATTENDANCE_POOL_SIZE sessions, headless unless ATTENDANCE_HEADED=1"""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = DriverPool(
+            size=int(os.environ.get("ATTENDANCE_POOL_SIZE", "1")),
+            headless=os.environ.get("ATTENDANCE_HEADED") != "1",
+        )
+        atexit.register(_shared_pool.shutdown)
+    return _shared_pool
@@ -0,0 +1,215 @@
+import csv
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from selenium.webdriver.support.wait import WebDriverWait
+from perf_stats import summarize
+
+# Event fields: (category, name, test ID, start ns, end ns, outcome, thread, detail, inside a wait)
+CATEGORY, NAME, TEST, START, END, OUTCOME, THREAD, DETAIL, IN_WAIT = range(9)
+
+SUMMARY_FIELDS = ["Test", "Wall (s)", "Commands", "Command Time (s)", "Command Errors", "Waits",
+                  "Wait Time (s)", "Other (s)", "Slowest Command"]
+
+
+class CommandTracer:
+    """Records every WebDriver command with the current test ID, its duration and its outcome.
+
+    `attach(driver)` shadows the driver's `execute`, which every command (including element
+    and frame-switching calls) goes through. WebDriverWait.until/until_not become "wait" spans
+    while a driver is attached, as do the FormWaits given this tracer, and tests can add their
+    own spans. Each event costs two clock
+    reads and a tuple append, so tracing can stay on in CI."""
+
+    def __init__(self):
+        self.events = []
+        self.test_id = ""
+        self.epoch_ns = time.time_ns() - time.perf_counter_ns()
+        self.lock = threading.Lock()
+        self._attached = {}
+        self._wait_depth = 0
+        self._original_waits = None
+
+    def attach(self, driver):
+        with self.lock:
+            if id(driver) in self._attached:
+                return driver
+            self._attached[id(driver)] = driver
+            if self._original_waits is None:
+                self._patch_waits()
+        execute = driver.execute
+        record = self.events.append
+        clock = time.perf_counter_ns
+
+        def traced_execute(driver_command, params=None):
+            start = clock()
+            try:
+                response = execute(driver_command, params)
+            except Exception as e:
+                record(("webdriver", driver_command, self.test_id, start, clock(), type(e).__name__,
+                        threading.get_ident(), _detail(params), self._wait_depth > 0))
+                raise
+            record(("webdriver", driver_command, self.test_id, start, clock(), "ok",
+                    threading.get_ident(), _detail(params), self._wait_depth > 0))
+            return response
+
+        driver.execute = traced_execute
+        return driver
+
+    def detach(self, driver):
+        with self.lock:
+            if self._attached.pop(id(driver), None) is None:
+                return
+            if not self._attached and self._original_waits:
+                WebDriverWait.until, WebDriverWait.until_not = self._original_waits
+                self._original_waits = None
+        # Drop the instance attribute so the class's execute is used again
+        driver.__dict__.pop("execute", None)
+
+    def _patch_waits(self):
+        self._original_waits = (WebDriverWait.until, WebDriverWait.until_not)
+        tracer = self
+        for attribute, original in zip(("until", "until_not"), self._original_waits):
+            def traced(wait, method, message="", _original=original, _name=attribute):
+                with tracer.span(f"WebDriverWait.{_name}", "wait", _condition_name(method)):
+                    return _original(wait, method, message)
+            setattr(WebDriverWait, attribute, traced)
+
+    @contextmanager
+    def span(self, name, category="phase", detail=""):
+        """Time a block as its own event; it nests around the commands run inside it"""
+        is_wait = category == "wait"
+        if is_wait:
+            self._wait_depth += 1
+        start = time.perf_counter_ns()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException as e:
+            outcome = type(e).__name__
+            raise
+        finally:
+            if is_wait:
+                self._wait_depth -= 1
+            self.events.append((category, name, self.test_id, start, time.perf_counter_ns(), outcome,
+                                threading.get_ident(), detail, False))
+
+    def begin_test(self, test_id):
+        self.test_id = test_id
+        self._test_start = time.perf_counter_ns()
+
+    def end_test(self, outcome="ok"):
+        self.events.append(("test", self.test_id, self.test_id, self._test_start, time.perf_counter_ns(), outcome,
+                            threading.get_ident(), "", False))
+        self.test_id = ""
+
+    def trace_events(self):
+        """Events in Chrome's trace event format (chrome://tracing, Perfetto, speedscope)"""
+        pid = os.getpid()
+        threads = {}
+        trace = []
+        for event in self.events:
+            args = {"test": event[TEST], "outcome": event[OUTCOME]}
+            if event[DETAIL]:
+                args["detail"] = event[DETAIL]
+            trace.append({
+                "name": event[NAME], "cat": event[CATEGORY], "ph": "X",
+                "ts": (self.epoch_ns + event[START]) / 1000, "dur": (event[END] - event[START]) / 1000,
+                "pid": event[THREAD][0] if isinstance(event[THREAD], tuple) else pid,
+                "tid": threads.setdefault(event[THREAD], len(threads) + 1), "args": args,
+            })
+        return trace
+
+    def export_trace(self, path):
+        with open(path, "w") as file:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, file)
+        return path
+
+    def summary(self):
+        """One row per test: wall time, command and wait totals, and the time spent outside both"""
+        tests = {}
+        for event in self.events:
+            stats = tests.setdefault(event[TEST], {
+                "wall": 0, "commands": 0, "command_ns": 0, "errors": 0, "waits": 0, "wait_ns": 0,
+                "outside_ns": 0, "by_command": {},
+            })
+            duration = event[END] - event[START]
+            if event[CATEGORY] == "test":
+                stats["wall"] += duration
+            elif event[CATEGORY] == "wait":
+                stats["waits"] += 1
+                stats["wait_ns"] += duration
+            elif event[CATEGORY] == "webdriver":
+                stats["commands"] += 1
+                stats["command_ns"] += duration
+                stats["errors"] += event[OUTCOME] != "ok"
+                if not event[IN_WAIT]:
+                    stats["outside_ns"] += duration
+                stats["by_command"][event[NAME]] = stats["by_command"].get(event[NAME], 0) + duration
+        rows = []
+        for test_id, stats in tests.items():
+            slowest = max(stats["by_command"].items(), key=lambda item: item[1], default=None)
+            other = stats["wall"] - stats["wait_ns"] - stats["outside_ns"] if stats["wall"] else 0
+            rows.append([
+                test_id or "(outside tests)", round(stats["wall"] / 1e9, 3), stats["commands"],
+                round(stats["command_ns"] / 1e9, 3), stats["errors"], stats["waits"], round(stats["wait_ns"] / 1e9, 3),
+                round(max(other, 0) / 1e9, 3), f"{slowest[0]} ({slowest[1] / 1e9:.3f}s)" if slowest else "",
+            ])
+        return rows
+
+    def command_stats(self):
+        """Duration percentiles (seconds) per WebDriver command"""
+        durations = {}
+        for event in self.events:
+            if event[CATEGORY] == "webdriver":
+                durations.setdefault(event[NAME], []).append((event[END] - event[START]) / 1e9)
+        return {name: summarize(values) for name, values in durations.items()}
+
+    def export_summary(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(SUMMARY_FIELDS)
+            writer.writerows(self.summary())
+        return path
+
+    def portable_events(self):
+        """Events on the wall clock with the process ID folded into the thread, for `merge` in another process"""
+        pid = os.getpid()
+        return [
+            event[:START] + (event[START] + self.epoch_ns, event[END] + self.epoch_ns, event[OUTCOME],
+                             (pid, event[THREAD])) + event[THREAD + 1:]
+            for event in self.events
+        ]
+
+    def merge(self, events):
+        """Add `portable_events()` from a worker process onto this tracer's clock"""
+        self.events.extend(
+            event[:START] + (event[START] - self.epoch_ns, event[END] - self.epoch_ns) + tuple(event[OUTCOME:])
+            for event in events
+        )
+
+
+def _detail(params):
+    # The URL or locator is enough to tell commands apart; script bodies and keystrokes are left out
+    if not params:
+        return ""
+    value = params.get("url") or params.get("value")
+    return value if isinstance(value, str) and len(value) <= 200 else ""
+
+
+def _condition_name(method):
+    # expected_conditions returns closures such as presence_of_element_located.<locals>._predicate
+    return getattr(method, "__qualname__", type(method).__name__).split(".")[0]
+
+
+_shared_tracer = None
+
+
+def get_tracer():
+    """Process-wide tracer when ATTENDANCE_TRACE=1, else None"""
+    global _shared_tracer
+    if _shared_tracer is None and os.environ.get("ATTENDANCE_TRACE") == "1":
+        _shared_tracer = CommandTracer()
+    return _shared_tracer
@@ -0,0 +1,228 @@
+#cd tests
+#python geofence.py --lat 12.9716 --lng 77.5946
+#python geofence.py --sites sites.json --roster roster
+import argparse
+import glob
+import json
+import math
+import os
+import time
+from collections import Counter
+from roster_generator import DEFAULT_SITES, METRES_PER_DEGREE
+
+DEFAULT_CELL_SIZE_M = 50
+
+# Shown by the local backend for sign-ins outside every site; contains "location" like the other location errors
+OUTSIDE_MESSAGE = "Your location is not within an allowed sign-in area."
+
+
+class Site:
+    """A named sign-in area: a circle (centre and radius in metres) or a polygon of (lat, lng) vertices"""
+
+    def __init__(self, name, latitude=None, longitude=None, radius=None, polygon=None):
+        self.name = name
+        self.polygon = [tuple(map(float, vertex)) for vertex in polygon] if polygon else None
+        if self.polygon:
+            if len(self.polygon) < 3:
+                raise ValueError(f"Site {name!r}: a polygon needs at least 3 vertices")
+            latitudes, longitudes = zip(*self.polygon)
+            self.bounds = (min(latitudes), min(longitudes), max(latitudes), max(longitudes))
+            return
+        if latitude is None or longitude is None or not radius or radius <= 0:
+            raise ValueError(f"Site {name!r} needs a polygon or a centre and a positive radius")
+        self.latitude, self.longitude, self.radius = float(latitude), float(longitude), float(radius)
+        # Equirectangular distances: exact enough for sites a few kilometres across
+        self.lng_scale = math.cos(math.radians(self.latitude))
+        self.radius_deg_sq = (self.radius / METRES_PER_DEGREE) ** 2
+        lat_span = self.radius / METRES_PER_DEGREE
+        lng_span = lat_span / max(self.lng_scale, 1e-6)
+        self.bounds = (self.latitude - lat_span, self.longitude - lng_span,
+                       self.latitude + lat_span, self.longitude + lng_span)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data.get("latitude"), data.get("longitude"), data.get("radius"), data.get("polygon"))
+
+    def to_dict(self):
+        if self.polygon:
+            return {"name": self.name, "polygon": [list(vertex) for vertex in self.polygon]}
+        return {"name": self.name, "latitude": self.latitude, "longitude": self.longitude, "radius": self.radius}
+
+    def contains(self, latitude, longitude):
+        if self.polygon is None:
+            d_lat = latitude - self.latitude
+            d_lng = (longitude - self.longitude) * self.lng_scale
+            return d_lat * d_lat + d_lng * d_lng <= self.radius_deg_sq
+        min_lat, min_lng, max_lat, max_lng = self.bounds
+        if not (min_lat <= latitude <= max_lat and min_lng <= longitude <= max_lng):
+            return False
+        # Ray casting along the latitude axis
+        inside = False
+        previous_lat, previous_lng = self.polygon[-1]
+        for vertex_lat, vertex_lng in self.polygon:
+            if (vertex_lng > longitude) != (previous_lng > longitude):
+                crossing = vertex_lat + (longitude - vertex_lng) * (previous_lat - vertex_lat) / (previous_lng - vertex_lng)
+                if latitude < crossing:
+                    inside = not inside
+            previous_lat, previous_lng = vertex_lat, vertex_lng
+        return inside
+
+    def covers_cell(self, min_lat, min_lng, max_lat, max_lng):
+        """True if the whole cell is inside; only decided for circles (convex), so a corner test suffices"""
+        if self.polygon is not None:
+            return False
+        return all(self.contains(lat, lng) for lat in (min_lat, max_lat) for lng in (min_lng, max_lng))
+
+
+class GeofenceIndex:
+    """Grid index over sign-in sites.
+
+    The map is cut into square cells of `cell_size_m` (in degrees of latitude). Each cell keeps
+    the sites whose bounding box overlaps it, and a cell lying entirely inside one circular site
+    answers without any geometry. A lookup is one dict access plus, near site edges, an exact
+    test against the few candidates. Where sites overlap, the first one in definition order wins."""
+
+    def __init__(self, sites, cell_size_m=DEFAULT_CELL_SIZE_M):
+        self.sites = list(sites)
+        self.cell_deg = cell_size_m / METRES_PER_DEGREE
+        self.inverse = 1 / self.cell_deg
+        candidates = {}
+        for site in self.sites:
+            min_lat, min_lng, max_lat, max_lng = site.bounds
+            for row in range(math.floor(min_lat * self.inverse), math.floor(max_lat * self.inverse) + 1):
+                for column in range(math.floor(min_lng * self.inverse), math.floor(max_lng * self.inverse) + 1):
+                    candidates.setdefault((row, column), []).append(site)
+        self.candidates = {cell: tuple(cell_sites) for cell, cell_sites in candidates.items()}
+        # Each cell maps to (name of the site covering all of it, or None; sites to test exactly, if not covered)
+        self.cells = {}
+        for (row, column), cell_sites in candidates.items():
+            bounds = (row * self.cell_deg, column * self.cell_deg, (row + 1) * self.cell_deg, (column + 1) * self.cell_deg)
+            if cell_sites[0].covers_cell(*bounds):
+                self.cells[(row, column)] = (cell_sites[0].name, ())
+            else:
+                self.cells[(row, column)] = (None, tuple(cell_sites))
+
+    @classmethod
+    def from_file(cls, path, cell_size_m=DEFAULT_CELL_SIZE_M):
+        """Sites from JSON: {"sites": [{"name", "latitude", "longitude", "radius"} or {"name", "polygon"}]}"""
+        with open(path) as file:
+            data = json.load(file)
+        return cls([Site.from_dict(site) for site in data["sites"]], cell_size_m)
+
+    @classmethod
+    def default(cls, cell_size_m=DEFAULT_CELL_SIZE_M):
+        """The roster generator's sites, centred on the TEST_STUDENTS locations"""
+        return cls([Site(name, latitude, longitude, radius) for name, latitude, longitude, radius in DEFAULT_SITES],
+                   cell_size_m)
+
+    def lookup(self, latitude, longitude):
+        """Name of the site containing the point, or None"""
+        # Also rejects NaN and values too large for a cell index
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return None
+        cell = self.cells.get((math.floor(latitude * self.inverse), math.floor(longitude * self.inverse)))
+        if cell is None:
+            return None
+        covering, candidates = cell
+        if covering is not None:
+            return covering
+        for site in candidates:
+            if site.contains(latitude, longitude):
+                return site.name
+        return None
+
+    def matches(self, latitude, longitude):
+        """Every site containing the point, in definition order"""
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return []
+        cell = (math.floor(latitude * self.inverse), math.floor(longitude * self.inverse))
+        return [site.name for site in self.candidates.get(cell, ()) if site.contains(latitude, longitude)]
+
+    def batch_lookup(self, latitudes, longitudes):
+        """lookup() over two columns of floats or numeric strings (e.g. a roster chunk); unreadable values give None"""
+        return list(map(self.lookup, _floats(latitudes), _floats(longitudes)))
+
+
+def load_geofence(spec, cell_size_m=DEFAULT_CELL_SIZE_M):
+    """None when `spec` is empty or "none", else the index for "default" (the roster sites) or a sites JSON file"""
+    if not spec or spec.lower() == "none":
+        return None
+    if spec == "default":
+        return GeofenceIndex.default(cell_size_m)
+    return GeofenceIndex.from_file(spec, cell_size_m)
+
+
+def _floats(values):
+    try:
+        return list(map(float, values))
+    except (TypeError, ValueError):
+        # NaN is outside every site
+        return list(map(_float_or_nan, values))
+
+
+def _float_or_nan(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _benchmark(index, points):
+    latitudes, longitudes = zip(*points)
+    lookup = index.lookup
+    start_time = time.perf_counter()
+    for latitude, longitude in points:
+        lookup(latitude, longitude)
+    single = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    index.batch_lookup(latitudes, longitudes)
+    batch = time.perf_counter() - start_time
+    print(f"lookup(): {single / len(points) * 1e9:.0f} ns/point, "
+          f"batch_lookup(): {batch / len(points) * 1e9:.0f} ns/point ({len(points) / batch:,.0f} points/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up sign-in coordinates against the geofenced sites")
+    parser.add_argument("--sites", help="Sites JSON file (default: the roster generator's sites)")
+    parser.add_argument("--cell-size", type=float, default=DEFAULT_CELL_SIZE_M, help="Grid cell size in metres")
+    parser.add_argument("--lat", type=float)
+    parser.add_argument("--lng", type=float)
+    parser.add_argument("--roster", help="Roster directory (or CSV file) to check every row of")
+    parser.add_argument("--benchmark", type=int, default=0, help="Time this many random lookups around the sites")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    index = GeofenceIndex.from_file(args.sites, args.cell_size) if args.sites else GeofenceIndex.default(args.cell_size)
+    print(f"Indexed {len(index.sites)} sites in {len(index.cells)} cells ({time.perf_counter() - start_time:.2f}s)")
+
+    if args.lat is not None and args.lng is not None:
+        print(f"({args.lat}, {args.lng}): {', '.join(index.matches(args.lat, args.lng)) or 'outside every site'}")
+
+    if args.roster:
+        import csv
+        paths = sorted(glob.glob(os.path.join(args.roster, "part-*.csv"))) if os.path.isdir(args.roster) else [args.roster]
+        counts = Counter()
+        start_time = time.perf_counter()
+        for path in paths:
+            with open(path, newline="", encoding="utf-8") as file:
+                rows = list(csv.DictReader(file))
+            counts.update(index.batch_lookup([row["Latitude"] for row in rows], [row["Longitude"] for row in rows]))
+        elapsed = time.perf_counter() - start_time
+        total = sum(counts.values())
+        print(f"Checked {total} rows in {elapsed:.2f}s")
+        for name, count in counts.most_common():
+            print(f"  {name or 'Outside every site':<30}{count:>10} ({count / total:.1%})")
+
+    if args.benchmark:
+        import random
+        rng = random.Random(0)
+        points = []
+        for _ in range(args.benchmark):
+            min_lat, min_lng, max_lat, max_lng = rng.choice(index.sites).bounds
+            margin = (max_lat - min_lat) / 2
+            points.append((rng.uniform(min_lat - margin, max_lat + margin), rng.uniform(min_lng - margin, max_lng + margin)))
+        _benchmark(index, points)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import json
+from datetime import datetime
+from html import escape
+from results_index import parse_load_time
+
+PAGE_SIZE = 100
+HISTOGRAM_BUCKET_S = 0.5
+HISTOGRAM_MAX_BUCKETS = 40
+
+HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        h1 {{ color: #333; }}
+        table {{ border-collapse: collapse; width: 100%; margin-bottom: 20px; }}
+        th, td {{ border: 1px solid #ddd; padding: 8px; }}
+        th {{ background-color: #f2f2f2; }}
+        .pass {{ background-color: #dff0d8; }}
+        .fail {{ background-color: #f2dede; }}
+        .histogram td {{ border: 0; padding: 2px 8px; }}
+        .bar {{ background-color: #5b9bd5; height: 14px; }}
+        .pager {{ margin: 10px 0; }}
+        .pager button, .pager select, .pager input {{ margin-right: 6px; }}
+    </style>
+</head>
+<body>
+    <h1>{title}</h1>
+    <p>Execution Time: {generated}</p>
+"""
+
+# Rows are embedded as JSON and only the current page is rendered, so the DOM stays small
+PAGER_SCRIPT = """
+    <script>
+        var rows = JSON.parse(document.getElementById("results-data").textContent);
+        var pageSize = %(page_size)d, page = 0, filtered = rows;
+        var body = document.getElementById("results-body");
+        function applyFilter() {
+            var status = document.getElementById("status-filter").value;
+            var search = document.getElementById("search").value.toLowerCase();
+            filtered = rows.filter(function (row) {
+                return (!status || row[2] === status) &&
+                    (!search || row.join(" ").toLowerCase().indexOf(search) !== -1);
+            });
+            page = 0;
+            render();
+        }
+        function render() {
+            var pages = Math.max(1, Math.ceil(filtered.length / pageSize));
+            page = Math.min(Math.max(page, 0), pages - 1);
+            body.textContent = "";
+            filtered.slice(page * pageSize, (page + 1) * pageSize).forEach(function (row) {
+                var tr = document.createElement("tr");
+                tr.className = row[2] === "PASS" ? "pass" : "fail";
+                row.forEach(function (value) {
+                    var td = document.createElement("td");
+                    td.textContent = value;
+                    tr.appendChild(td);
+                });
+                body.appendChild(tr);
+            });
+            document.getElementById("page-info").textContent =
+                "Page " + (page + 1) + " of " + pages + " (" + filtered.length + " rows)";
+        }
+        document.getElementById("prev").onclick = function () { page--; render(); };
+        document.getElementById("next").onclick = function () { page++; render(); };
+        document.getElementById("status-filter").onchange = applyFilter;
+        document.getElementById("search").oninput = applyFilter;
+        render();
+    </script>
+"""
+
+
+def _json_for_script(value):
+    # "<" escaped so no value can close the surrounding <script> element
+    return json.dumps(value).replace("<", "\\u003c")
+
+
+def summarize_results(results):
+    """Single pass over the results: per-test counts, load-time stats and a load-time histogram"""
+    tests = {}
+    histogram = {}
+    summary = None
+    for result in results:
+        if result["Test ID"] == "SUMMARY":
+            summary = result["Comments"]
+            continue
+        stats = tests.setdefault(result["Test ID"], {
+            "name": result["Test Name"], "runs": 0, "passed": 0,
+            "load_count": 0, "load_total": 0.0, "load_min": None, "load_max": None,
+        })
+        stats["name"] = result["Test Name"]
+        stats["runs"] += 1
+        stats["passed"] += result["Status"] == "PASS"
+        load_time = parse_load_time(result["Comments"])
+        if load_time is not None:
+            stats["load_count"] += 1
+            stats["load_total"] += load_time
+            stats["load_min"] = load_time if stats["load_min"] is None else min(stats["load_min"], load_time)
+            stats["load_max"] = load_time if stats["load_max"] is None else max(stats["load_max"], load_time)
+            bucket = min(int(load_time / HISTOGRAM_BUCKET_S), HISTOGRAM_MAX_BUCKETS - 1)
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+    return tests, histogram, summary
+
+
+def _write_summary(file, tests, summary):
+    total = sum(stats["runs"] for stats in tests.values())
+    passed = sum(stats["passed"] for stats in tests.values())
+    file.write(f"    <p>Results: {total}, Passed: {passed}, Failed: {total - passed}</p>\n")
+    if summary:
+        file.write(f"    <p>{escape(summary)}</p>\n")
+    file.write("""    <h2>Summary by Test</h2>
+    <table>
+        <tr><th>Test ID</th><th>Test Name</th><th>Runs</th><th>Passed</th><th>Failed</th><th>Pass Rate</th><th>Load Time (min / mean / max)</th></tr>
+""")
+    for test_id in sorted(tests):
+        stats = tests[test_id]
+        failed = stats["runs"] - stats["passed"]
+        load = ""
+        if stats["load_count"]:
+            mean = stats["load_total"] / stats["load_count"]
+            load = f"{stats['load_min']:.2f}s / {mean:.2f}s / {stats['load_max']:.2f}s"
+        row_class = "pass" if not failed else "fail"
+        file.write(
+            f'        <tr class="{row_class}"><td>{escape(test_id)}</td><td>{escape(stats["name"])}</td>'
+            f'<td>{stats["runs"]}</td><td>{stats["passed"]}</td><td>{failed}</td>'
+            f'<td>{stats["passed"] / stats["runs"]:.1%}</td><td>{load}</td></tr>\n'
+        )
+    file.write("    </table>\n")
+
+
+def _write_histogram(file, histogram):
+    if not histogram:
+        return
+    file.write('    <h2>Load Time Distribution</h2>\n    <table class="histogram">\n')
+    peak = max(histogram.values())
+    for bucket in range(min(histogram), max(histogram) + 1):
+        count = histogram.get(bucket, 0)
+        low = bucket * HISTOGRAM_BUCKET_S
+        label = f"{low:.1f}s+" if bucket == HISTOGRAM_MAX_BUCKETS - 1 else f"{low:.1f}-{low + HISTOGRAM_BUCKET_S:.1f}s"
+        file.write(
+            f'        <tr><td>{label}</td><td style="width: 70%"><div class="bar" style="width: {count / peak:.1%}"></div></td>'
+            f"<td>{count}</td></tr>\n"
+        )
+    file.write("    </table>\n")
+
+
+def write_html_report(filename, results_source, title="Attendance System Test Results", page_size=PAGE_SIZE):
+    """Write the report in two streaming passes over `results_source()` (a callable returning
+    a fresh iterator of result dicts): aggregates first, then the rows straight to the file."""
+    tests, histogram, summary = summarize_results(results_source())
+    with open(filename, "w", encoding="utf-8") as file:
+        file.write(HEAD.format(title=escape(title), generated=datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        _write_summary(file, tests, summary)
+        _write_histogram(file, histogram)
+        file.write("""    <h2>Results</h2>
+    <div class="pager">
+        <button id="prev">Previous</button><button id="next">Next</button>
+        <select id="status-filter"><option value="">All</option><option>PASS</option><option>FAIL</option></select>
+        <input id="search" placeholder="Filter rows">
+        <span id="page-info"></span>
+    </div>
+    <noscript><p>Enable JavaScript to browse the result rows; they are also in the CSV export.</p></noscript>
+    <table>
+        <thead><tr><th>Test ID</th><th>Test Name</th><th>Status</th><th>Timestamp</th><th>Comments</th></tr></thead>
+        <tbody id="results-body"></tbody>
+    </table>
+    <script type="application/json" id="results-data">[""")
+        first = True
+        for result in results_source():
+            if result["Test ID"] == "SUMMARY":
+                continue
+            row = [result["Test ID"], result["Test Name"], result["Status"], result["Timestamp"], result["Comments"]]
+            file.write(("\n" if first else ",\n") + _json_for_script(row))
+            first = False
+        file.write("]</script>\n")
+        file.write(PAGER_SCRIPT % {"page_size": page_size})
+        file.write("</body>\n</html>\n")
+    return filename
@@ -0,0 +1,259 @@
+#cd tests
+#python load_test.py --local --students 2000 --concurrency 100 --window 300
+import argparse
+import asyncio
+import json
+import random
+import ssl
+import time
+from urllib.parse import urlencode, urljoin, urlsplit
+from local_server import LocalAttendanceServer
+from perf_stats import summarize
+
+# Apps Script reports quota exhaustion as an ordinary page rather than a 429
+THROTTLE_MARKERS = (b"too many times", b"rate limit", b"quota")
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+
+def load_templates():
+    from test_attendance import AttendanceSystemTests
+    return AttendanceSystemTests.TEST_STUDENTS
+
+
+def virtual_students(templates, count, seed=0):
+    """Derive `count` distinct students from the TEST_STUDENTS templates"""
+    rng = random.Random(seed)
+    for index in range(count):
+        template = templates[index % len(templates)]
+        local_part, domain = template["Email"].split("@", 1)
+        yield {
+            "Email": f"{local_part}+load{index}@{domain}",
+            "Name": f"{template['Name']} {index}",
+            "Description": template["Description"],
+            "Latitude": f"{float(template['Latitude']) + rng.uniform(-0.001, 0.001):.6f}",
+            "Longitude": f"{float(template['Longitude']) + rng.uniform(-0.001, 0.001):.6f}",
+        }
+
+
+class StaleConnectionError(ConnectionError):
+    """The connection hit EOF before a status line, as when the server has closed an idle keep-alive socket"""
+
+
+class HttpConnection:
+    """Minimal keep-alive HTTP/1.1 client on asyncio streams (the repo has no async HTTP dependency)"""
+
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+        self.origin = None
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, url, body=b"", headers=None):
+        parts = urlsplit(url)
+        origin = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {parts.netloc}", f"Content-Length: {len(body)}"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+        reused = self.writer is not None and origin == self.origin
+        try:
+            return await self._exchange(origin, payload)
+        except StaleConnectionError:
+            if not reused:
+                raise
+            # The server closed the idle keep-alive connection before reading the request; resend once on a new one
+            return await self._exchange(origin, payload)
+
+    async def _exchange(self, origin, payload):
+        if self.writer is None or origin != self.origin:
+            await self.close()
+            context = ssl.create_default_context() if origin[0] == "https" else None
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(origin[1], origin[2], ssl=context), self.timeout
+            )
+            self.origin = origin
+        self.writer.write(payload)
+        try:
+            await self.writer.drain()
+            status, response_headers, response_body, keep_alive = await asyncio.wait_for(
+                self._read_response(), self.timeout
+            )
+        except BaseException:
+            await self.close()
+            raise
+        if not keep_alive:
+            await self.close()
+        return status, response_headers, response_body
+
+    async def _read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise StaleConnectionError("Connection closed before a response was received")
+        version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            keep_alive = False
+        return int(status), headers, body, keep_alive
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+        self.reader = self.writer = None
+
+
+async def submit(connection, url, action, student, max_redirects=5):
+    """POST one sign-in/sign-out and classify the outcome"""
+    body = urlencode(dict(student, action=action)).encode("utf-8")
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    status, response_headers, response_body = await connection.request("POST", url, body, headers)
+    # The deployed web app answers doPost with a redirect to the actual content
+    for _ in range(max_redirects):
+        if status not in REDIRECT_CODES or "location" not in response_headers:
+            break
+        url = urljoin(url, response_headers["location"])
+        status, response_headers, response_body = await connection.request("GET", url)
+    if status == 429 or any(marker in response_body.lower() for marker in THROTTLE_MARKERS):
+        return "throttled"
+    if status >= 400:
+        return "http_error"
+    try:
+        result = json.loads(response_body)
+    except ValueError:
+        return "ok"
+    return "ok" if result.get("ok", True) else "rejected"
+
+
+async def run_load(url, students, concurrency=50, window=0.0, sign_out=True, timeout=30, seed=0):
+    """Drive sign-ins (and sign-outs) for `students`, with arrivals spread uniformly over `window` seconds.
+
+    Samples are (action, outcome, latency, service time). Latency runs from the scheduled arrival
+    (a sign-out is due when its sign-in finishes), so time spent waiting for a free connection
+    counts: past saturation it grows instead of vanishing from the percentiles."""
+    rng = random.Random(seed)
+    queue = asyncio.Queue()
+    for offset, student in sorted(((rng.uniform(0, window), student) for student in students), key=lambda item: item[0]):
+        queue.put_nowait((offset, student))
+    samples = []
+    start_time = time.perf_counter()
+
+    async def worker():
+        connection = HttpConnection(timeout)
+        try:
+            while not queue.empty():
+                offset, student = queue.get_nowait()
+                scheduled = start_time + offset
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                for action in ("signIn", "signOut") if sign_out else ("signIn",):
+                    request_start = time.perf_counter()
+                    try:
+                        outcome = await submit(connection, url, action, student)
+                    # EOFError covers asyncio.IncompleteReadError, a response cut off mid-body
+                    except (OSError, EOFError, asyncio.TimeoutError, ValueError) as e:
+                        outcome = "timeout" if isinstance(e, asyncio.TimeoutError) else "transport_error"
+                    finished = time.perf_counter()
+                    samples.append((action, outcome, finished - scheduled, finished - request_start))
+                    scheduled = finished
+        finally:
+            await connection.close()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - start_time
+
+
+def build_report(samples, elapsed):
+    outcomes = {}
+    for _, outcome, _, _ in samples:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    errors = sum(count for outcome, count in outcomes.items() if outcome not in ("ok", "rejected"))
+    report = {
+        "requests": len(samples),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "outcomes": outcomes,
+        "latency_ms": summarize([latency * 1000 for _, _, latency, _ in samples]),
+        "service_ms": summarize([service * 1000 for _, _, _, service in samples]),
+        "client_wait_ms": summarize([(latency - service) * 1000 for _, _, latency, service in samples]),
+        "by_action": {},
+    }
+    for action in sorted({action for action, _, _, _ in samples}):
+        latencies = [latency * 1000 for name, _, latency, _ in samples if name == action]
+        report["by_action"][action] = summarize(latencies)
+    return report
+
+
+def print_report(report):
+    latency = report["latency_ms"]
+    print(f"Requests: {report['requests']} in {report['elapsed_s']:.2f}s ({report['throughput_rps']:.1f} req/s)")
+    print(f"Error rate: {report['error_rate']:.2%}  Outcomes: {report['outcomes']}")
+    print(f"Latency: p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, p99 {latency['p99']:.1f} ms, max {latency['max']:.1f} ms")
+    service, wait = report["service_ms"], report["client_wait_ms"]
+    print(f"  of which waiting for a free connection: p50 {wait['p50']:.1f} ms, p95 {wait['p95']:.1f} ms, max {wait['max']:.1f} ms"
+          f" (request alone: p50 {service['p50']:.1f} ms, p95 {service['p95']:.1f} ms)")
+    for action, stats in report["by_action"].items():
+        print(f"  {action}: p50 {stats['p50']:.1f} ms, p95 {stats['p95']:.1f} ms, p99 {stats['p99']:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent sign-in/sign-out load generator")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Backend endpoint accepting form-encoded POSTs with an 'action' field")
+    target.add_argument("--local", action="store_true", help="Start the local stand-in server and target it")
+    parser.add_argument("--students", type=int, default=1000, help="Number of virtual students")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent connections")
+    parser.add_argument("--window", type=float, default=0.0, help="Spread sign-ins over this many seconds")
+    parser.add_argument("--no-sign-out", action="store_true", help="Only send sign-ins")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    server = LocalAttendanceServer().start() if args.local else None
+    url = server.url if server else args.url
+    try:
+        students = list(virtual_students(load_templates(), args.students, args.seed))
+        samples, elapsed = asyncio.run(run_load(
+            url, students, args.concurrency, args.window, not args.no_sign_out, args.timeout, args.seed
+        ))
+    finally:
+        if server:
+            server.stop()
+    report = build_report(samples, elapsed)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
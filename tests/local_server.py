@@ -0,0 +1,345 @@
+#cd tests
+#python local_server.py --port 8765
+import json
+import socket
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from geofence import OUTSIDE_MESSAGE, load_geofence
+from validation import JS_EMAIL_PATTERN, MESSAGES, NUMBER_PATTERN, coordinates, validate_record
+
+# Same nesting as the deployed web app: outer page -> sandboxFrame -> userHtmlFrame
+OUTER_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <title>Attendance Tracking System</title>
+    <style>
+        body { margin: 0; }
+        iframe { border: 0; width: 100%; height: 100vh; }
+    </style>
+</head>
+<body>
+    <iframe id="sandboxFrame" src="/sandbox"></iframe>
+</body>
+</html>
+"""
+
+SANDBOX_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body { margin: 0; }
+        iframe { border: 0; width: 100%; height: 100vh; }
+    </style>
+</head>
+<body>
+    <iframe id="userHtmlFrame" src="/userHtml"></iframe>
+</body>
+</html>
+"""
+
+# Minimal stand-in for the google.script.run bridge and the browser geolocation API
+SCRIPT_BRIDGE = """
+    <script>
+        var STUB_LOCATION = %(location)s;
+        function callBackend(action, data, onSuccess, onFailure) {
+            var body = new URLSearchParams(data || {});
+            body.set("action", action);
+            fetch("/exec", { method: "POST", body: body })
+                .then(function (response) { return response.json(); })
+                .then(function (result) {
+                    if (result.ok) { onSuccess && onSuccess(result.message); }
+                    else { onFailure && onFailure(new Error(result.message)); }
+                })
+                .catch(function (error) { onFailure && onFailure(error); });
+        }
+        function scriptRunner(successHandler, failureHandler) {
+            return new Proxy({}, {
+                get: function (target, name) {
+                    if (name === "withSuccessHandler") {
+                        return function (fn) { return scriptRunner(fn, failureHandler); };
+                    }
+                    if (name === "withFailureHandler") {
+                        return function (fn) { return scriptRunner(successHandler, fn); };
+                    }
+                    return function (data) { callBackend(name, data, successHandler, failureHandler); };
+                }
+            });
+        }
+        window.google = { script: { run: scriptRunner(null, null) } };
+        if (STUB_LOCATION) {
+            navigator.geolocation.getCurrentPosition = function (success) {
+                setTimeout(function () {
+                    success({ coords: { latitude: STUB_LOCATION[0], longitude: STUB_LOCATION[1] } });
+                }, 50);
+            };
+        }
+    </script>
+"""
+
+FORM_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <base target="_top">
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        .form-group { margin-bottom: 12px; }
+        label { display: block; font-weight: bold; }
+        input, textarea { width: 300px; padding: 6px; }
+        .btn { padding: 8px 16px; margin-right: 8px; }
+        .btn-login { background-color: #4CAF50; color: white; }
+        .btn-logout { background-color: #f44336; color: white; }
+        #status { margin-top: 12px; }
+    </style>
+%(bridge)s
+</head>
+<body>
+    <h2>Attendance Tracking System</h2>
+    <form id="attendanceForm" onsubmit="return false;">
+        <div class="form-group">
+            <label for="Email">Email</label>
+            <input type="email" id="Email" name="Email">
+        </div>
+        <div class="form-group">
+            <label for="Name">Name</label>
+            <input type="text" id="Name" name="Name">
+        </div>
+        <div class="form-group">
+            <label for="Description">Description</label>
+            <textarea id="Description" name="Description"></textarea>
+        </div>
+        <div class="form-group">
+            <label for="Latitude">Latitude</label>
+            <input type="text" id="Latitude" name="Latitude" readonly>
+        </div>
+        <div class="form-group">
+            <label for="Longitude">Longitude</label>
+            <input type="text" id="Longitude" name="Longitude" readonly>
+        </div>
+        <button type="button" id="locationBtn" class="btn" onclick="getLocation()">Get Location</button>
+        <button type="button" class="btn btn-login" onclick="submitAttendance('signIn')">Sign In</button>
+        <button type="button" class="btn btn-logout" onclick="submitAttendance('signOut')">Sign Out</button>
+    </form>
+    <div id="status"></div>
+    <script>
+        var EMAIL_PATTERN = new RegExp("^(?:" + %(email_pattern)s + ")$");
+        var NUMBER_PATTERN = new RegExp("^(?:" + %(number_pattern)s + ")$");
+        var MESSAGES = %(messages)s;
+        // Same rules, in the same order, as validation.py
+        function validateAttendance(data) {
+            if (!data.Email || !data.Name) { return MESSAGES.missing_identity; }
+            if (!EMAIL_PATTERN.test(data.Email)) { return MESSAGES.invalid_email; }
+            if (!data.Latitude || !data.Longitude) { return MESSAGES.missing_location; }
+            if (!NUMBER_PATTERN.test(data.Latitude) || !NUMBER_PATTERN.test(data.Longitude)) {
+                return MESSAGES.invalid_location;
+            }
+            var lat = Number(data.Latitude), lng = Number(data.Longitude);
+            if (!(lat >= -90 && lat <= 90 && lng >= -180 && lng <= 180)) { return MESSAGES.invalid_location; }
+            return null;
+        }
+        function setStatus(message) {
+            document.getElementById("status").innerText = message;
+        }
+        function getLocation() {
+            if (!navigator.geolocation) {
+                setStatus("Geolocation is not supported by this browser.");
+                return;
+            }
+            navigator.geolocation.getCurrentPosition(function (position) {
+                document.getElementById("Latitude").value = position.coords.latitude;
+                document.getElementById("Longitude").value = position.coords.longitude;
+                setStatus("Location captured successfully!");
+            }, function () {
+                setStatus("Unable to retrieve your location.");
+            });
+        }
+        function submitAttendance(action) {
+            var data = {
+                Email: document.getElementById("Email").value.trim(),
+                Name: document.getElementById("Name").value.trim(),
+                Description: document.getElementById("Description").value.trim(),
+                Latitude: document.getElementById("Latitude").value.trim(),
+                Longitude: document.getElementById("Longitude").value.trim()
+            };
+            var error = validateAttendance(data);
+            if (error) {
+                setStatus(error);
+                return;
+            }
+            setStatus("Processing...");
+            google.script.run
+                .withSuccessHandler(setStatus)
+                .withFailureHandler(function (error) { setStatus("Error: " + error.message); })[action](data);
+        }
+    </script>
+</body>
+</html>
+"""
+
+DEFAULT_LOCATION = (12.9716, 77.5946)
+
+
+class AttendanceBackend:
+    """In-memory stand-in for the Apps Script signIn/signOut functions and their sheet"""
+
+    COLUMNS = ["Date", "Email", "Name", "Description", "Latitude", "Longitude", "Login", "Logout"]
+
+    def __init__(self, geofence=None):
+        self.records = []
+        self.lock = threading.Lock()
+        self.geofence = geofence
+
+    def validate(self, data):
+        error = validate_record(data)
+        if error:
+            return MESSAGES[error]
+        if self.geofence and self.geofence.lookup(*coordinates(data)) is None:
+            return OUTSIDE_MESSAGE
+        return None
+
+    def sign_in(self, data):
+        error = self.validate(data)
+        if error:
+            return False, error
+        now = datetime.now()
+        with self.lock:
+            self.records.append({
+                "Date": now.strftime("%Y-%m-%d"),
+                "Email": data["Email"].strip(),
+                "Name": data["Name"].strip(),
+                "Description": data.get("Description", "").strip(),
+                "Latitude": data["Latitude"],
+                "Longitude": data["Longitude"],
+                "Login": now.strftime("%H:%M"),
+                "Logout": "",
+            })
+        return True, "Sign in successful!"
+
+    def sign_out(self, data):
+        error = self.validate(data)
+        if error:
+            return False, error
+        now = datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        email = data["Email"].strip()
+        with self.lock:
+            for record in reversed(self.records):
+                if record["Email"] == email and record["Date"] == today and not record["Logout"]:
+                    record["Logout"] = now.strftime("%H:%M")
+                    return True, "Sign out successful!"
+        return False, "No active login found for today."
+
+    def handle(self, action, data):
+        if action == "signIn":
+            return self.sign_in(data)
+        if action == "signOut":
+            return self.sign_out(data)
+        return False, f"Unknown action: {action}"
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+    # Keep-alive, so load tests measure the backend rather than connection setup
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; with Nagle on, the body waits for the client's delayed ACK
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path in ("/", "/exec"):
+            self._send_html(OUTER_PAGE)
+        elif path == "/sandbox":
+            self._send_html(SANDBOX_PAGE)
+        elif path == "/userHtml":
+            self._send_html(self.server.form_page)
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/exec":
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        params = parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True)
+        data = {key: values[0] for key, values in params.items()}
+        ok, message = self.server.backend.handle(data.pop("action", ""), data)
+        self._send(200, "application/json", json.dumps({"ok": ok, "message": message}))
+
+    def _send_html(self, html):
+        self._send(200, "text/html; charset=utf-8", html)
+
+    def _send(self, code, content_type, body):
+        payload = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections under concurrent load tests
+    request_queue_size = 128
+
+
+class LocalAttendanceServer:
+    """Local HTTP stand-in for the Apps Script web app, served on a background thread"""
+
+    def __init__(self, host="127.0.0.1", port=0, location=DEFAULT_LOCATION, verbose=False, geofence=None):
+        self.backend = AttendanceBackend(geofence)
+        self.httpd = _Server((host, port), _RequestHandler)
+        self.httpd.backend = self.backend
+        self.httpd.verbose = verbose
+        self.httpd.form_page = FORM_PAGE % {
+            "bridge": SCRIPT_BRIDGE % {"location": json.dumps(list(location) if location else None)},
+            "email_pattern": json.dumps(JS_EMAIL_PATTERN),
+            "number_pattern": json.dumps(NUMBER_PATTERN),
+            "messages": json.dumps(MESSAGES),
+        }
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/exec"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve the attendance form locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--geofence", help='Sites JSON file, or "default" for the roster sites; sign-ins elsewhere are rejected')
+    args = parser.parse_args()
+    server = LocalAttendanceServer(args.host, args.port, verbose=True, geofence=load_geofence(args.geofence))
+    print(f"Serving attendance app at {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -0,0 +1,187 @@
+#cd tests
+#python page_load_benchmark.py --local --samples 10
+#python page_load_benchmark.py --local --samples 10 --update-baseline
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
+from perf_stats import summarize
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "page_load_baseline.json")
+
+# Navigation and Resource Timing for the document the driver is currently switched to
+TIMING_SCRIPT = """
+var nav = performance.getEntriesByType("navigation")[0];
+var resources = performance.getEntriesByType("resource");
+var transfer = 0;
+resources.forEach(function (entry) { transfer += entry.transferSize || 0; });
+if (!nav) { return null; }
+return {
+    timeOrigin: performance.timeOrigin,
+    dns: nav.domainLookupEnd - nav.domainLookupStart,
+    connect: nav.connectEnd - nav.connectStart,
+    ttfb: nav.responseStart,
+    domInteractive: nav.domInteractive,
+    domContentLoaded: nav.domContentLoadedEventEnd,
+    load: nav.loadEventEnd,
+    resources: resources.length,
+    transferKB: transfer / 1024
+};
+"""
+
+FRAMES = [("outer", None), ("sandbox", "sandboxFrame"), ("form", "userHtmlFrame")]
+
+# Metrics where a percentage change is meaningful; counts and sizes are reported but not flagged
+TIMED_FIELDS = ["dns", "connect", "ttfb", "domContentLoaded", "load"]
+
+
+def collect_sample(driver, app_url, timeout=30, cold=False):
+    """Load the app once and return a flat {metric: value} dict; times in ms"""
+    if cold:
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        except (WebDriverException, AttributeError):
+            pass
+    start_time = time.perf_counter()
+    driver.get(app_url)
+    timings = {}
+    for label, frame_id in FRAMES:
+        if frame_id:
+            WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.ID, frame_id)))
+            driver.switch_to.frame(driver.find_element(By.ID, frame_id))
+        timings[label] = driver.execute_script(TIMING_SCRIPT)
+    WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.ID, "attendanceForm")))
+    sample = {"wall": (time.perf_counter() - start_time) * 1000}
+    for label, timing in timings.items():
+        if timing is None:
+            continue
+        for field in TIMED_FIELDS + ["resources", "transferKB"]:
+            sample[f"{label}.{field}"] = timing[field]
+    outer, form = timings.get("outer"), timings.get("form")
+    if outer and form:
+        # attendanceForm is static markup, so it exists once the form document is parsed
+        sample["timeToForm"] = form["timeOrigin"] + form["domInteractive"] - outer["timeOrigin"]
+    return sample
+
+
+def run_benchmark(driver, app_url, samples=5, timeout=30, cold=False):
+    collected = [collect_sample(driver, app_url, timeout, cold) for _ in range(samples)]
+    metrics = {}
+    for sample in collected:
+        for name, value in sample.items():
+            metrics.setdefault(name, []).append(value)
+    return {name: summarize(values) for name, values in metrics.items()}
+
+
+def load_baseline(target, path=DEFAULT_BASELINE):
+    """Stored baseline for `target` ("local" or the app URL), or None if there is none"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        baseline = json.load(file)
+    return baseline if baseline.get("target") == target else None
+
+
+def save_baseline(stats, target, path=DEFAULT_BASELINE):
+    with open(path, "w") as file:
+        json.dump({
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "target": target,
+            "metrics": {name: {"p50": values["p50"], "p95": values["p95"]} for name, values in stats.items()},
+        }, file, indent=2, sort_keys=True)
+
+
+def is_timed_metric(name):
+    return name in ("wall", "timeToForm") or name.split(".")[-1] in TIMED_FIELDS
+
+
+def compare_to_baseline(stats, baseline, threshold_pct=20.0, min_delta_ms=5.0):
+    """Return one row per timed metric; a metric regresses when its p50 or p95 grows by more
+    than threshold_pct and by more than min_delta_ms (so sub-millisecond jitter is ignored)"""
+    rows = []
+    for name in sorted(stats):
+        if not is_timed_metric(name) or name not in baseline["metrics"]:
+            continue
+        for stat in ("p50", "p95"):
+            before, after = baseline["metrics"][name][stat], stats[name][stat]
+            change = (after - before) / before * 100 if before else 0.0
+            rows.append({
+                "metric": name,
+                "stat": stat,
+                "baseline": before,
+                "current": after,
+                "change_pct": change,
+                "regression": change > threshold_pct and after - before > min_delta_ms,
+            })
+    return rows
+
+
+def print_stats(stats):
+    print(f"{'Metric':<28}{'p50':>10}{'p95':>10}{'max':>10}")
+    for name in sorted(stats):
+        values = stats[name]
+        print(f"{name:<28}{values['p50']:>10.1f}{values['p95']:>10.1f}{values['max']:>10.1f}")
+
+
+def print_comparison(rows):
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['metric']:<28}{row['stat']:>5}{row['baseline']:>10.1f}{row['current']:>10.1f}"
+              f"{row['change_pct']:>+9.1f}% {flag}")
+
+
+def main():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from local_server import LocalAttendanceServer
+
+    parser = argparse.ArgumentParser(description="Multi-sample page load benchmark for the attendance web app")
+    parser.add_argument("--url", help="Web app URL (default: ATTENDANCE_APP_URL or the deployed app)")
+    parser.add_argument("--local", action="store_true", help="Benchmark the local stand-in server")
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--cold", action="store_true", help="Clear the browser cache before every sample")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    local = args.local or (not args.url and os.environ.get("ATTENDANCE_APP_URL") == "local")
+    server = LocalAttendanceServer().start() if local else None
+    if server:
+        app_url = server.url
+        target = "local"
+    else:
+        from test_attendance import AttendanceSystemTests
+        app_url = target = args.url or os.environ.get("ATTENDANCE_APP_URL", AttendanceSystemTests.DEPLOYED_APP_URL)
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--window-size=1920,1080")
+    driver = webdriver.Chrome(options=chrome_options)
+    try:
+        stats = run_benchmark(driver, app_url, args.samples, cold=args.cold)
+    finally:
+        driver.quit()
+        if server:
+            server.stop()
+    print_stats(stats)
+    if args.update_baseline:
+        save_baseline(stats, target, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return
+    baseline = load_baseline(target, args.baseline)
+    if baseline is None:
+        print(f"No baseline for {target} in {args.baseline}; run with --update-baseline to create one")
+        return
+    rows = compare_to_baseline(stats, baseline, args.threshold)
+    print_comparison(rows)
+    if any(row["regression"] for row in rows):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#cd tests
+#python parallel_runner.py --workers 4
+import argparse
+import io
+import multiprocessing
+import os
+import time
+import unittest
+from driver_pool import get_pool
+from driver_tracing import get_tracer
+from artifacts import get_collector
+from result_sink import iter_results
+from test_attendance import AttendanceSystemTests, finish_run
+
+
+def shard_test_names(test_names, workers):
+    """Deal test methods round-robin so each shard gets a similar mix of slow and fast tests"""
+    shards = [[] for _ in range(min(workers, len(test_names)))]
+    for index, name in enumerate(test_names):
+        shards[index % len(shards)].append(name)
+    return shards
+
+
+def _run_shard(test_names, result_prefix):
+    # Runs in a fresh worker process, so setUpClass gives this shard its own WebDriver session
+    sink = AttendanceSystemTests.open_result_sink(result_prefix)
+    stream = io.StringIO()
+    suite = unittest.TestSuite(AttendanceSystemTests(name) for name in test_names)
+    result = unittest.TextTestRunner(stream=stream, verbosity=2).run(suite)
+    sink.close()
+    # Pool workers exit without running atexit handlers, so quit the browsers and finish writing artifacts here
+    get_pool().shutdown()
+    get_collector().flush()
+    return {
+        "pid": os.getpid(),
+        "output": stream.getvalue(),
+        "tests_run": result.testsRun,
+        "failures": len(result.failures),
+        "errors": len(result.errors),
+        "result_sink": sink.prefix,
+        "wait_timings": AttendanceSystemTests.wait_timings,
+        "trace_events": get_tracer().portable_events() if get_tracer() else [],
+    }
+
+
+def run_parallel(workers=None):
+    test_names = unittest.TestLoader().getTestCaseNames(AttendanceSystemTests)
+    shards = shard_test_names(test_names, workers or os.cpu_count() or 1)
+    print(f"Running {len(test_names)} tests across {len(shards)} workers")
+    sink = AttendanceSystemTests.open_result_sink()
+    # Workers inherit the environment, so their failure artifacts land in one run directory
+    os.environ.setdefault("ATTENDANCE_RUN_ID", sink.prefix.rsplit("_results_", 1)[-1])
+    start_time = time.time()
+    # spawn rather than fork: each worker starts with empty class state and no inherited browser
+    with multiprocessing.get_context("spawn").Pool(len(shards)) as pool:
+        shard_results = pool.starmap(
+            _run_shard, [(shard, f"{sink.prefix}.worker{index}") for index, shard in enumerate(shards)]
+        )
+    elapsed = time.time() - start_time
+
+    tests_run = failures = errors = 0
+    for shard, shard_result in zip(shards, shard_results):
+        print(f"=== Worker {shard_result['pid']}: {', '.join(shard)} ===")
+        print(shard_result["output"])
+        tests_run += shard_result["tests_run"]
+        failures += shard_result["failures"]
+        errors += shard_result["errors"]
+        AttendanceSystemTests.wait_timings.extend(shard_result["wait_timings"])
+        if get_tracer():
+            get_tracer().merge(shard_result["trace_events"])
+        # Fold the worker's stream into the run's sink, then drop the worker files
+        for result in iter_results(f"{shard_result['result_sink']}.jsonl"):
+            sink.write(result)
+        for extension in (".jsonl", ".csv"):
+            os.remove(shard_result["result_sink"] + extension)
+    print(f"Parallel run finished in {elapsed:.2f}s")
+    finish_run(tests_run, failures, errors)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run AttendanceSystemTests sharded across worker processes")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-run the structural checks instead of reusing cached verdicts")
+    args = parser.parse_args()
+    if args.no_cache:
+        # Workers are spawned with this environment
+        os.environ["ATTENDANCE_RESULT_CACHE"] = "none"
+    run_parallel(args.workers)
@@ -0,0 +1,24 @@
+import math
+
+
+def percentile(sorted_values, pct):
+    """Linearly interpolated percentile of an already sorted list (pct in 0..100)"""
+    if not sorted_values:
+        return float("nan")
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def summarize(values, percentiles=(50, 95, 99)):
+    ordered = sorted(values)
+    summary = {
+        "count": len(ordered),
+        "min": ordered[0] if ordered else float("nan"),
+        "max": ordered[-1] if ordered else float("nan"),
+        "mean": sum(ordered) / len(ordered) if ordered else float("nan"),
+    }
+    for pct in percentiles:
+        summary[f"p{pct}"] = percentile(ordered, pct)
+    return summary
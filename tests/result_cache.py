@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+DEFAULT_PATH = "result_cache.json"
+
+# Comments recorded with a result, so exports show whether the check ran in the browser
+CACHE_HIT = "Result cache: hit"
+CACHE_MISS = "Result cache: miss"
+
+
+def fingerprint(*parts):
+    """SHA-256 over the parts; separated so ("ab", "c") and ("a", "bc") differ"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_fingerprint(path):
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+class ResultCache:
+    """Verdicts of checks that depend only on static markup, keyed by test ID and a fingerprint.
+
+    The fingerprint covers the served form HTML, the backend version and the check's own source,
+    so any change to one of them is a miss. Only passes are stored: a failing check always runs
+    again. Stores re-read the file first, so parallel workers do not drop each other's entries."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.entries = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                entries = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def lookup(self, test_id, key):
+        """The stored entry ({"key", "status", "verified_at"}) if it was recorded under this key, else None"""
+        entry = self.entries.get(test_id)
+        if entry and entry.get("key") == key:
+            return entry
+        return None
+
+    def store(self, test_id, key, status="PASS"):
+        entry = {"key": key, "status": status, "verified_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        self.entries[test_id] = entry
+        entries = self._read()
+        entries[test_id] = entry
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(entries, file, indent=1, sort_keys=True)
+        os.replace(temporary, self.path)
+        return entry
+
+
+def load_result_cache(spec):
+    """None when `spec` is empty or "none" (caching off), else the cache stored at that path"""
+    if not spec or spec.lower() == "none":
+        return None
+    return ResultCache(spec)
@@ -0,0 +1,63 @@
+import csv
+import json
+import os
+
+FIELDNAMES = ["Test ID", "Test Name", "Status", "Timestamp", "Comments"]
+
+
+class ResultSink:
+    """Appends each test result to disk as it is recorded, so a killed run keeps everything so far.
+
+    Every result goes to `<prefix>.jsonl`; the CSV mirror at `<prefix>.csv` has the same
+    columns as the exported results and, like them, leaves out SUMMARY rows."""
+
+    def __init__(self, prefix, fsync=False):
+        self.prefix = prefix
+        self.jsonl_path = f"{prefix}.jsonl"
+        self.csv_path = f"{prefix}.csv"
+        self.fsync = fsync
+        self.count = 0
+        self.jsonl_file = open(self.jsonl_path, "a", encoding="utf-8")
+        if self.jsonl_file.tell() and not _ends_with_newline(self.jsonl_path):
+            # Resuming after a crash: do not glue the next record onto a half-written line
+            self.jsonl_file.write("\n")
+        new_csv = not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) == 0
+        self.csv_file = open(self.csv_path, "a", newline="", encoding="utf-8")
+        self.csv_writer = csv.DictWriter(self.csv_file, fieldnames=FIELDNAMES, extrasaction="ignore")
+        if new_csv:
+            self.csv_writer.writeheader()
+            self.csv_file.flush()
+
+    def write(self, result):
+        self.jsonl_file.write(json.dumps(result) + "\n")
+        self.jsonl_file.flush()
+        if result["Test ID"] != "SUMMARY":
+            self.csv_writer.writerow(result)
+            self.csv_file.flush()
+        if self.fsync:
+            os.fsync(self.jsonl_file.fileno())
+            os.fsync(self.csv_file.fileno())
+        self.count += 1
+
+    def close(self):
+        for file in (self.jsonl_file, self.csv_file):
+            if not file.closed:
+                file.close()
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b"\n"
+
+
+def iter_results(*jsonl_paths):
+    """Stream results back from one or more JSONL files, one dict at a time"""
+    for path in jsonl_paths:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Last line of a run that was killed mid-write
+                    continue
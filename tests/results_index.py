@@ -0,0 +1,276 @@
+#cd tests
+#python results_index.py ingest .
+#python results_index.py pass-rate --test TC_08
+#python results_index.py flaky
+#python results_index.py load-trend
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+from html.parser import HTMLParser
+from result_sink import FIELDNAMES
+
+DEFAULT_DB = "attendance_results.db"
+
+# Only a run's own exports; not <run>.trace_summary.csv or the <run>.workerN streams of a parallel run
+RUN_FILE = re.compile(r"(attendance_test_results_(\d{8}_\d{6}))\.(jsonl|csv|html)")
+LOAD_TIME = re.compile(r"Load time: ([\d.]+)s")
+
+# When a run was exported in several formats, the most complete one wins
+FORMAT_PRIORITY = {".jsonl": 3, ".csv": 2, ".html": 1}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    started_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    format TEXT NOT NULL,
+    ingested_bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    seq INTEGER NOT NULL,
+    test_id TEXT NOT NULL,
+    test_name TEXT,
+    status TEXT,
+    timestamp TEXT,
+    comments TEXT,
+    load_time REAL,
+    PRIMARY KEY (run_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_results_test_run ON results (test_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs (started_at);
+"""
+
+
+class _ReportTableParser(HTMLParser):
+    """Pulls the result rows out of an exported HTML report: table rows in older reports,
+    the embedded results-data JSON in paginated ones"""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._row = None
+        self._cell = None
+        self._data = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "script" and ("id", "results-data") in attrs:
+            self._data = []
+        elif tag == "tr":
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell = []
+
+    def handle_data(self, data):
+        if self._data is not None:
+            self._data.append(data)
+        elif self._cell is not None:
+            self._cell.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._data is not None:
+            self.rows.extend(dict(zip(FIELDNAMES, row)) for row in json.loads("".join(self._data)))
+            self._data = None
+        elif tag == "td" and self._cell is not None:
+            self._row.append("".join(self._cell).strip())
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if len(self._row) == len(FIELDNAMES):
+                self.rows.append(dict(zip(FIELDNAMES, self._row)))
+            self._row = None
+
+
+def _read_rows(path, offset=0):
+    """Rows in `path` past byte `offset` (JSONL only; other formats are read whole)"""
+    extension = os.path.splitext(path)[1]
+    if extension == ".jsonl":
+        with open(path, "rb") as file:
+            file.seek(offset)
+            data = file.read()
+        # Leave a trailing partial line for the next ingest
+        complete = data[:data.rfind(b"\n") + 1]
+        rows = []
+        for line in complete.decode("utf-8").splitlines():
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                continue
+        return rows, offset + len(complete)
+    if extension == ".csv":
+        with open(path, newline="", encoding="utf-8") as file:
+            return list(csv.DictReader(file)), os.path.getsize(path)
+    parser = _ReportTableParser()
+    with open(path, encoding="utf-8") as file:
+        parser.feed(file.read())
+    return parser.rows, os.path.getsize(path)
+
+
+class ResultsIndex:
+    """SQLite index over exported result files, keyed by run and test ID"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def ingest_paths(self, paths):
+        """Ingest result files and directories of them; returns the number of new result rows"""
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                for extension in FORMAT_PRIORITY:
+                    files.extend(glob.glob(os.path.join(path, f"attendance_test_results_*{extension}")))
+            else:
+                files.append(path)
+        # Highest-priority format first, so a run's JSONL is indexed instead of its CSV/HTML copies
+        files.sort(key=lambda path: -FORMAT_PRIORITY.get(os.path.splitext(path)[1], 0))
+        return sum(self.ingest_file(path) for path in files)
+
+    def ingest_file(self, path):
+        match = RUN_FILE.fullmatch(os.path.basename(path))
+        if not match:
+            return 0
+        name = match.group(1)
+        extension = "." + match.group(3)
+        row = self.connection.execute(
+            "SELECT run_id, source, format, ingested_bytes FROM runs WHERE name = ?", (name,)
+        ).fetchone()
+        offset = 0
+        if row:
+            run_id, source, run_format, ingested_bytes = row
+            if FORMAT_PRIORITY[run_format] > FORMAT_PRIORITY[extension]:
+                return 0
+            if os.path.abspath(source) == os.path.abspath(path) and extension == ".jsonl":
+                offset = ingested_bytes
+            elif os.path.abspath(source) == os.path.abspath(path) and os.path.getsize(path) == ingested_bytes:
+                return 0
+            else:
+                self.connection.execute("DELETE FROM results WHERE run_id = ?", (run_id,))
+        rows, ingested_bytes = _read_rows(path, offset)
+        with self.connection:
+            if row:
+                self.connection.execute(
+                    "UPDATE runs SET source = ?, format = ?, ingested_bytes = ? WHERE run_id = ?",
+                    (path, extension, ingested_bytes, run_id),
+                )
+            else:
+                started_at = datetime.strptime(match.group(2), "%Y%m%d_%H%M%S").strftime("%Y-%m-%d %H:%M:%S")
+                run_id = self.connection.execute(
+                    "INSERT INTO runs (name, started_at, source, format, ingested_bytes) VALUES (?, ?, ?, ?, ?)",
+                    (name, started_at, path, extension, ingested_bytes),
+                ).lastrowid
+            seq = self.connection.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM results WHERE run_id = ?", (run_id,)
+            ).fetchone()[0]
+            records = [
+                (run_id, seq + index, result["Test ID"], result.get("Test Name"), result.get("Status"),
+                 result.get("Timestamp"), result.get("Comments"), parse_load_time(result.get("Comments")))
+                for index, result in enumerate(r for r in rows if r.get("Test ID") not in (None, "", "SUMMARY"))
+            ]
+            self.connection.executemany(
+                "INSERT INTO results (run_id, seq, test_id, test_name, status, timestamp, comments, load_time) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                records,
+            )
+        return len(records)
+
+    def pass_rate(self, test_id=None, bucket="day"):
+        """(test_id, period, runs, pass_rate) per test per day/week/month"""
+        period = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}[bucket]
+        query = (
+            "SELECT r.test_id, strftime(?, runs.started_at) AS period, COUNT(*), "
+            "AVG(r.status = 'PASS') FROM results r JOIN runs ON runs.run_id = r.run_id "
+        )
+        params = [period]
+        if test_id:
+            query += "WHERE r.test_id = ? "
+            params.append(test_id)
+        query += "GROUP BY r.test_id, period ORDER BY r.test_id, period"
+        return self.connection.execute(query, params).fetchall()
+
+    def flakiest(self, limit=10, min_runs=2):
+        """(test_id, runs, status_flips, flip_rate, fail_rate), most often flipping first"""
+        return self.connection.execute(
+            """
+            WITH ordered AS (
+                SELECT r.test_id, r.status,
+                       LAG(r.status) OVER (PARTITION BY r.test_id ORDER BY runs.started_at, r.seq) AS previous
+                FROM results r JOIN runs ON runs.run_id = r.run_id
+            )
+            SELECT test_id, COUNT(*) AS runs,
+                   SUM(previous IS NOT NULL AND status != previous) AS flips,
+                   CAST(SUM(previous IS NOT NULL AND status != previous) AS REAL) / (COUNT(*) - 1) AS flip_rate,
+                   AVG(status != 'PASS') AS fail_rate
+            FROM ordered GROUP BY test_id HAVING COUNT(*) >= ?
+            ORDER BY flip_rate DESC, fail_rate DESC LIMIT ?
+            """,
+            (max(min_runs, 2), limit),
+        ).fetchall()
+
+    def load_time_trend(self, test_id="TC_11", limit=None):
+        """(started_at, load_time_seconds, status) for every run of `test_id`, oldest first"""
+        query = (
+            "SELECT runs.started_at, r.load_time, r.status FROM results r JOIN runs ON runs.run_id = r.run_id "
+            "WHERE r.test_id = ? AND r.load_time IS NOT NULL ORDER BY runs.started_at"
+        )
+        rows = self.connection.execute(query, (test_id,)).fetchall()
+        return rows[-limit:] if limit else rows
+
+
+def parse_load_time(comments):
+    match = LOAD_TIME.search(comments or "")
+    return float(match.group(1)) if match else None
+
+
+def ingest_stream(jsonl_path, db_path=DEFAULT_DB):
+    """Index a live run's result stream; safe to call repeatedly as the stream grows"""
+    index = ResultsIndex(db_path)
+    try:
+        return index.ingest_file(jsonl_path)
+    finally:
+        index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index and query historical attendance test results")
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Index result files (.jsonl/.csv/.html) or directories of them")
+    ingest.add_argument("paths", nargs="*", default=["."])
+    pass_rate = commands.add_parser("pass-rate", help="Pass rate per test over time")
+    pass_rate.add_argument("--test")
+    pass_rate.add_argument("--bucket", choices=["day", "week", "month"], default="day")
+    flaky = commands.add_parser("flaky", help="Tests whose status flips most between runs")
+    flaky.add_argument("--limit", type=int, default=10)
+    trend = commands.add_parser("load-trend", help="Page load time per run")
+    trend.add_argument("--test", default="TC_11")
+    trend.add_argument("--limit", type=int)
+    args = parser.parse_args()
+
+    index = ResultsIndex(args.db)
+    try:
+        if args.command == "ingest":
+            print(f"Indexed {index.ingest_paths(args.paths)} new results into {args.db}")
+        elif args.command == "pass-rate":
+            for test_id, period, runs, rate in index.pass_rate(args.test, args.bucket):
+                print(f"{test_id:<10}{period:<12}{runs:>6} runs {rate:>8.1%}")
+        elif args.command == "flaky":
+            for test_id, runs, flips, flip_rate, fail_rate in index.flakiest(args.limit):
+                print(f"{test_id:<10}{runs:>6} runs {flips:>5} flips {flip_rate:>8.1%} flip rate {fail_rate:>8.1%} failing")
+        elif args.command == "load-trend":
+            for started_at, load_time, status in index.load_time_trend(args.test, args.limit):
+                print(f"{started_at}  {load_time:>6.2f}s  {status}")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
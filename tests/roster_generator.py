@@ -0,0 +1,198 @@
+#cd tests
+#python roster_generator.py --rows 1000000 --out roster --seed 42
+#python roster_generator.py --rows 100000 --sites sites.json --start-time 08:30 --end-time 16:00
+import argparse
+import csv
+import gzip
+import json
+import math
+import os
+import random
+from datetime import date, timedelta
+
+# Same schema as AttendanceSystemTests.TEST_STUDENTS
+COLUMNS = ["Date", "Email", "Name", "Description", "Latitude", "Longitude", "Login", "Logout"]
+
+# (name, latitude, longitude, radius in metres); the centres are the TEST_STUDENTS locations
+DEFAULT_SITES = [
+    ("Bengaluru Campus", 12.9716, 77.5946, 400),
+    ("Chennai Campus", 13.0827, 80.2707, 300),
+    ("Field Station", 12.5678, 78.9012, 150),
+]
+
+FIRST_NAMES = ["John", "Jane", "Test", "Asha", "Ravi", "Priya", "Arjun", "Meera", "Kiran", "Divya",
+               "Rahul", "Sneha", "Vikram", "Anita", "Suresh", "Lakshmi", "Amit", "Neha", "Karthik", "Pooja"]
+LAST_NAMES = ["Smith", "Doe", "Student", "Rao", "Iyer", "Sharma", "Nair", "Reddy", "Menon", "Gupta",
+              "Kumar", "Das", "Pillai", "Joshi", "Patel", "Singh", "Verma", "Bose", "Shetty", "Kapoor"]
+DOMAINS = ["example.com", "work.net", "university.edu"]
+DESCRIPTIONS = ["Present for the entire session.", "Attended the morning session.", "Late arrival.",
+                "Attended the afternoon session.", "Left early.", ""]
+
+METRES_PER_DEGREE = 111320.0
+
+
+def _mix(value):
+    """Cheap deterministic integer hash, so per-student attributes agree across chunks"""
+    value = (value ^ (value >> 33)) * 0xff51afd7ed558ccd & 0xFFFFFFFFFFFFFFFF
+    value = (value ^ (value >> 33)) * 0xc4ceb9fe1a85ec53 & 0xFFFFFFFFFFFFFFFF
+    return value ^ (value >> 33)
+
+
+def _clock(minutes):
+    minutes = int(minutes) % (24 * 60)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class RosterGenerator:
+    """Streams synthetic attendance records in fixed-size column chunks.
+
+    Row i belongs to student i % students on day i // students, so every student gets one
+    record per day and a unique email. Each chunk is seeded from (seed, chunk index), which
+    makes the output deterministic and lets any chunk be regenerated on its own."""
+
+    def __init__(self, students=10000, start_date=None, sites=None, seed=0, start_time="09:00",
+                 end_time="17:00", late_rate=0.1, missing_logout_rate=0.05, invalid_rate=0.01):
+        self.students = students
+        self.start_date = start_date or date.today() - timedelta(days=1)
+        self.sites = sites or DEFAULT_SITES
+        self.seed = seed
+        hours, minutes = map(int, start_time.split(":"))
+        self.start_minutes = hours * 60 + minutes
+        hours, minutes = map(int, end_time.split(":"))
+        self.end_minutes = hours * 60 + minutes
+        self.late_rate = late_rate
+        self.missing_logout_rate = missing_logout_rate
+        self.invalid_rate = invalid_rate
+
+    def student(self, index):
+        key = _mix(self.seed * 0x9E3779B97F4A7C15 + index)
+        first = FIRST_NAMES[key % len(FIRST_NAMES)]
+        last = LAST_NAMES[(key >> 8) % len(LAST_NAMES)]
+        domain = DOMAINS[(key >> 16) % len(DOMAINS)]
+        site = self.sites[(key >> 24) % len(self.sites)]
+        return f"{first.lower()}.{last.lower()}.{index}@{domain}", f"{first} {last}", site
+
+    def chunk(self, chunk_index, start_row, rows):
+        """Columns {name: list} for rows [start_row, start_row + rows)"""
+        rng = random.Random(f"{self.seed}:{chunk_index}")
+        gauss, uniform, expovariate = rng.gauss, rng.random, rng.expovariate
+        columns = {name: [] for name in COLUMNS}
+        dates, emails, names, descriptions, lats, lngs, logins, logouts = (columns[name] for name in COLUMNS)
+        students = {}
+        days = {}
+        for row in range(start_row, start_row + rows):
+            student_index = row % self.students
+            student = students.get(student_index)
+            if student is None:
+                email, name, (_, site_lat, site_lng, radius) = self.student(student_index)
+                lat_sigma = radius / 3 / METRES_PER_DEGREE
+                lng_sigma = lat_sigma / max(math.cos(math.radians(site_lat)), 1e-6)
+                student = students[student_index] = (email, name, site_lat, site_lng, lat_sigma, lng_sigma)
+            email, name, site_lat, site_lng, lat_sigma, lng_sigma = student
+            day = row // self.students
+            if day not in days:
+                days[day] = (self.start_date + timedelta(days=day)).isoformat()
+            latitude = f"{gauss(site_lat, lat_sigma):.6f}"
+            longitude = f"{gauss(site_lng, lng_sigma):.6f}"
+            login = self.start_minutes + gauss(-5, 5)
+            if uniform() < self.late_rate:
+                login = self.start_minutes + 5 + expovariate(1 / 30)
+            logout = "" if uniform() < self.missing_logout_rate else _clock(max(login + 30, gauss(self.end_minutes, 30)))
+            if uniform() < self.invalid_rate:
+                # The invalid inputs the form tests use: TC_10's 999 coordinates, TC_08's email, TC_09's name
+                kind = rng.randrange(3)
+                if kind == 0:
+                    latitude = longitude = "999"
+                elif kind == 1:
+                    email = "invalid-email"
+                else:
+                    name = ""
+            dates.append(days[day])
+            emails.append(email)
+            names.append(name)
+            descriptions.append(DESCRIPTIONS[int(uniform() * len(DESCRIPTIONS))])
+            lats.append(latitude)
+            lngs.append(longitude)
+            logins.append(_clock(login))
+            logouts.append(logout)
+        return columns
+
+    def chunks(self, rows, chunk_size=100000):
+        for chunk_index, start_row in enumerate(range(0, rows, chunk_size)):
+            yield chunk_index, self.chunk(chunk_index, start_row, min(chunk_size, rows - start_row))
+
+
+def load_sites(path):
+    """Sites from a JSON file in the format geofence.py reads. Polygons are approximated by the
+    circle inscribed in their bounding box, so generated points cluster around them."""
+    from geofence import Site
+    with open(path) as file:
+        data = json.load(file)
+    sites = []
+    for site in map(Site.from_dict, data["sites"]):
+        if site.polygon is None:
+            sites.append((site.name, site.latitude, site.longitude, site.radius))
+            continue
+        min_lat, min_lng, max_lat, max_lng = site.bounds
+        latitude = (min_lat + max_lat) / 2
+        width = (max_lng - min_lng) * math.cos(math.radians(latitude))
+        sites.append((site.name, latitude, (min_lng + max_lng) / 2, min(max_lat - min_lat, width) / 2 * METRES_PER_DEGREE))
+    return sites
+
+
+def write_roster(generator, rows, out_dir, chunk_size=100000, compress=False):
+    """Write `rows` records as part-NNNNN.csv[.gz] files plus a manifest; memory stays at one chunk"""
+    os.makedirs(out_dir, exist_ok=True)
+    parts = []
+    for chunk_index, columns in generator.chunks(rows, chunk_size):
+        filename = f"part-{chunk_index:05d}.csv" + (".gz" if compress else "")
+        path = os.path.join(out_dir, filename)
+        opener = gzip.open if compress else open
+        with opener(path, "wt", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS)
+            writer.writerows(zip(*(columns[name] for name in COLUMNS)))
+        parts.append({"file": filename, "rows": len(columns["Date"])})
+    manifest = {
+        "columns": COLUMNS,
+        "rows": rows,
+        "students": generator.students,
+        "seed": generator.seed,
+        "chunk_size": chunk_size,
+        "sites": generator.sites,
+        "parts": parts,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic attendance roster in chunked CSV files")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--students", type=int, default=None, help="Distinct students (default: one per row)")
+    parser.add_argument("--out", default="roster")
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--start-time", default="09:00", help="Expected arrival time")
+    parser.add_argument("--end-time", default="17:00", help="Typical sign-out time")
+    parser.add_argument("--sites", help="Sites JSON file, as read by geofence.py (default: the built-in sites)")
+    parser.add_argument("--late-rate", type=float, default=0.1)
+    parser.add_argument("--missing-logout-rate", type=float, default=0.05)
+    parser.add_argument("--invalid-rate", type=float, default=0.01)
+    parser.add_argument("--gzip", action="store_true", help="Compress each part file")
+    args = parser.parse_args()
+
+    generator = RosterGenerator(
+        students=args.students or args.rows, start_date=args.start_date,
+        sites=load_sites(args.sites) if args.sites else None, seed=args.seed,
+        start_time=args.start_time, end_time=args.end_time, late_rate=args.late_rate,
+        missing_logout_rate=args.missing_logout_rate, invalid_rate=args.invalid_rate,
+    )
+    manifest = write_roster(generator, args.rows, args.out, args.chunk_size, args.gzip)
+    print(f"Wrote {manifest['rows']} records in {len(manifest['parts'])} parts to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#cd tests
+#python -m unittest test_artifacts
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from selenium.common.exceptions import NoSuchFrameException
+import artifacts
+import test_attendance
+from artifacts import ArtifactCollector
+
+
+class FakeSwitchTo:
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def default_content(self):
+        self.driver.frames = []
+
+    def frame(self, frame):
+        if frame not in self.driver.available_frames:
+            raise NoSuchFrameException(frame)
+        self.driver.frames.append(frame)
+
+
+class FakeDriver:
+    """Answers the calls ArtifactCollector.capture makes"""
+
+    def __init__(self, available_frames=("sandboxFrame", "userHtmlFrame"), screenshot_bytes=1000):
+        self.available_frames = available_frames
+        self.screenshot_bytes = screenshot_bytes
+        self.frames = []
+        self.switch_to = FakeSwitchTo(self)
+
+    def get_screenshot_as_png(self):
+        return os.urandom(self.screenshot_bytes)
+
+    @property
+    def page_source(self):
+        return f"<html>{'/'.join(self.frames) or 'outer'}</html>"
+
+    def get_log(self, kind):
+        return [{"level": "SEVERE", "message": "boom"}]
+
+
+class ArtifactCollectorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_capture_writes_zip_and_index_entry(self):
+        collector = ArtifactCollector(self.root, "run1")
+        collector.capture(FakeDriver(available_frames=("sandboxFrame",)), "test_03", "failed")
+        collector.flush()
+        [entry] = collector.entries(run="run1", test="test_03")
+        self.assertEqual(entry["reason"], "failed")
+        with zipfile.ZipFile(os.path.join(self.root, entry["path"])) as archive:
+            self.assertEqual(archive.getinfo("screenshot.png").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(archive.read("dom_sandbox.html"), b"<html>sandboxFrame</html>")
+            # The form frame could not be reached, so its error is kept instead
+            self.assertIn("dom_form.error.txt", archive.namelist())
+            self.assertEqual(json.loads(archive.read("console.json"))[0]["message"], "boom")
+
+    def test_oldest_captures_are_evicted(self):
+        collector = ArtifactCollector(self.root, "run1", max_bytes=25000)
+        for index in range(5):
+            collector.capture(FakeDriver(screenshot_bytes=10000), f"test_{index}", "failed")
+        collector.flush()
+        entries = collector.entries()
+        self.assertEqual([entry["test"] for entry in entries], ["test_3", "test_4"])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.root, "run1"))), ["test_3.zip", "test_4.zip"])
+
+
+class FailureCaptureTests(unittest.TestCase):
+    """AttendanceSystemTests.tearDown captures artifacts for failed tests only"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.collector = ArtifactCollector(self.root, "run1")
+        self.previous, artifacts._shared_collector = artifacts._shared_collector, self.collector
+
+    def tearDown(self):
+        artifacts._shared_collector = self.previous
+        shutil.rmtree(self.root)
+
+    def test_failed_and_erroring_tests_are_captured(self):
+        class Tests(test_attendance.AttendanceSystemTests):
+            driver = FakeDriver()
+            tracer = None
+
+            @classmethod
+            def setUpClass(cls):
+                pass
+
+            @classmethod
+            def tearDownClass(cls):
+                pass
+
+            def setUp(self):
+                pass
+
+            def test_fails(self):
+                self.fail("status not shown")
+
+            def test_errors(self):
+                raise KeyError("Email")
+
+            def test_passes(self):
+                pass
+
+        suite = unittest.TestSuite(Tests(name) for name in ("test_fails", "test_errors", "test_passes"))
+        result = unittest.TestResult()
+        suite.run(result)
+        self.assertEqual((len(result.failures), len(result.errors)), (1, 1))
+        self.collector.flush()
+        captured = sorted(entry["test"] for entry in self.collector.entries(run="run1"))
+        self.assertEqual(captured, ["test_errors", "test_fails"])
+        for entry in self.collector.entries():
+            self.assertTrue(os.path.exists(os.path.join(self.root, entry["path"])))
+
+
+if __name__ == "__main__":
+    unittest.main()
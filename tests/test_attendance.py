@@ -1,22 +1,37 @@
 #cd tests
 #python test_attendance.py
 import unittest
-import time
-import csv
 import os
+import inspect
 from datetime import datetime, timedelta
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from local_server import LocalAttendanceServer
+from driver_pool import get_pool
+from waits import FormWaits
+from result_sink import ResultSink, iter_results
+from results_index import ingest_stream
+from html_report import write_html_report
+from page_load_benchmark import run_benchmark, load_baseline, compare_to_baseline
+from validation import MESSAGES, STATUS_KEYWORDS, coordinates, fuzz_records, validate_record
+from geofence import OUTSIDE_MESSAGE, load_geofence
+from driver_tracing import get_tracer
+from artifacts import get_collector
+from result_cache import CACHE_HIT, CACHE_MISS, DEFAULT_PATH, file_fingerprint, fingerprint, load_result_cache
 
 class AttendanceSystemTests(unittest.TestCase):
     """Test suite for Attendance Web Management System using Selenium with ChromeDriver"""
     
-    # Class variable to store all test results
-    test_results = []
+    # Results are streamed to disk as they are recorded; opened on first use
+    result_sink = None
+    
+    # Class variable to store how long each status/location wait took
+    wait_timings = []
+    
+    # Deployed web app; set ATTENDANCE_APP_URL to another URL, or to "local" for the bundled stand-in
+    DEPLOYED_APP_URL = "https://script.google.com/macros/s/AKfycbzWKHMP6tORLC-KpWSP1db1HIqP1yMTFVLy4SuyJS4u5O3HhRIJDz5CkFbRBiVAeJfB/exec"
     
     # Test data
     TEST_STUDENTS = [
@@ -66,109 +81,250 @@ class AttendanceSystemTests(unittest.TestCase):
         "getLocation": {"by": By.ID, "value": "locationBtn"},
     }
     
+    # Fields that hold a value, as opposed to the buttons
+    INPUT_FIELDS = ["Email", "Name", "Description", "Latitude", "Longitude"]
+    
+    # Fields a user types into; Latitude/Longitude are filled by the Get Location button
+    KEYSTROKE_FIELDS = ["Email", "Name", "Description"]
+    
+    # Sets several fields in one round trip and fires the events typing would, so validation still runs
+    FILL_FIELDS_SCRIPT = """
+        var values = arguments[0], missing = [];
+        Object.keys(values).forEach(function (id) {
+            var field = document.getElementById(id);
+            if (!field) { missing.push(id); return; }
+            field.value = values[id];
+            field.dispatchEvent(new Event("input", { bubbles: true }));
+            field.dispatchEvent(new Event("change", { bubbles: true }));
+        });
+        return missing;
+    """
+    
+    # Page load samples taken by TC_11, and the slowdown against page_load_baseline.json that fails it
+    PERF_SAMPLES = int(os.environ.get("ATTENDANCE_PERF_SAMPLES", "3"))
+    PERF_REGRESSION_PCT = float(os.environ.get("ATTENDANCE_PERF_REGRESSION_PCT", "20"))
+    
+    # Sites the local stand-in accepts sign-ins from: a sites JSON file, "default" (around TEST_STUDENTS) or "none"
+    GEOFENCE = os.environ.get("ATTENDANCE_GEOFENCE", "default")
+    
+    # Fuzzed submissions TC_12 replays in the browser and checks against the validation engine
+    FUZZ_SAMPLES = int(os.environ.get("ATTENDANCE_FUZZ_SAMPLES", "5"))
+    FUZZ_SEED = int(os.environ.get("ATTENDANCE_FUZZ_SEED", "0"))
+    
+    # Input values as the browser stored them (inputs drop line breaks, email inputs also trim)
+    READ_FIELDS_SCRIPT = """
+        var values = {};
+        arguments[0].forEach(function (id) {
+            var field = document.getElementById(id);
+            values[id] = field ? field.value : "";
+        });
+        return values;
+    """
+    
+    # Structural checks whose verdict is reused while the form HTML, backend version and the check itself are unchanged
+    CACHEABLE_TESTS = ["test_01_page_loads_correctly", "test_02_form_elements_exist"]
+    
+    # "inplace" resets the already loaded form between tests; "reload" navigates to app_url before every test
+    RESET_MODE = os.environ.get("ATTENDANCE_RESET_MODE", "inplace")
+    
+    # Restores the form and #status in one call; returns false if the page is not in a reusable state
+    RESET_FORM_SCRIPT = """
+        var form = document.getElementById("attendanceForm");
+        var status = document.getElementById("status");
+        if (!form || !status || !window.frameElement || window.frameElement.id !== "userHtmlFrame") {
+            return false;
+        }
+        // A backend call still in flight would overwrite #status during the next test
+        if (/processing/i.test(status.innerText)) {
+            return false;
+        }
+        ["Email", "Name", "Description", "Latitude", "Longitude"].forEach(function (id) {
+            var field = document.getElementById(id);
+            if (field) { field.value = ""; }
+        });
+        form.querySelectorAll("button").forEach(function (button) { button.disabled = false; });
+        status.innerText = "";
+        return true;
+    """
+    
     @classmethod
     def setUpClass(cls):
-        chrome_options = Options()
-        # Uncomment for headless testing
-        # chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--window-size=1920,1080")
-        cls.driver = webdriver.Chrome(options=chrome_options)
-        cls.app_url = "https://script.google.com/macros/s/AKfycbzWKHMP6tORLC-KpWSP1db1HIqP1yMTFVLy4SuyJS4u5O3HhRIJDz5CkFbRBiVAeJfB/exec"
-        cls.driver.get(cls.app_url)
-        cls.driver.save_screenshot("debug_page_initial.png")
-        print("=== PAGE SOURCE AFTER LOAD ===")
-        print(cls.driver.page_source)
+        # Headless sessions from the shared pool; ATTENDANCE_HEADED=1 to watch the browser
+        cls.driver = get_pool().lease()
+        # ATTENDANCE_TRACE=1 records every WebDriver command; exported with the results
+        cls.tracer = get_tracer()
+        if cls.tracer:
+            cls.tracer.attach(cls.driver)
+            cls.tracer.begin_test("setUpClass")
+        cls.local_server = None
+        cls.geofence = None
+        cls.app_url = os.environ.get("ATTENDANCE_APP_URL", cls.DEPLOYED_APP_URL)
+        if cls.app_url == "local":
+            cls.geofence = load_geofence(cls.GEOFENCE)
+            cls.local_server = LocalAttendanceServer(geofence=cls.geofence).start()
+            cls.app_url = cls.local_server.url
+        cls.waits = FormWaits(cls.driver, cls.wait_timings, tracer=cls.tracer)
+        get_pool().navigate(cls.driver, cls.app_url)
         try:
-            # Switch to sandboxFrame
-            WebDriverWait(cls.driver, 30).until(
-                EC.presence_of_element_located((By.ID, "sandboxFrame"))
-            )
-            iframe1 = cls.driver.find_element(By.ID, "sandboxFrame")
-            cls.driver.switch_to.frame(iframe1)
-            # Switch to userHtmlFrame
-            WebDriverWait(cls.driver, 30).until(
-                EC.presence_of_element_located((By.ID, "userHtmlFrame"))
-            )
-            iframe2 = cls.driver.find_element(By.ID, "userHtmlFrame")
-            cls.driver.switch_to.frame(iframe2)
-            # Now wait for the form inside the second iframe
-            WebDriverWait(cls.driver, 30).until(
-                EC.presence_of_element_located((By.ID, "attendanceForm"))
-            )
+            cls.enter_app_frames()
         except Exception as e:
-            cls.driver.save_screenshot("debug_page_error.png")
-            print("=== PAGE SOURCE ON ERROR ===")
-            print(cls.driver.page_source)
+            get_collector().capture(cls.driver, "setUpClass", str(e))
             print(f"ERROR: Could not find attendanceForm after 30 seconds: {e}")
             raise
+        # ATTENDANCE_RESULT_CACHE is the cache file, or "none" (--no-cache) to run every check
+        cls.result_cache = load_result_cache(os.environ.get("ATTENDANCE_RESULT_CACHE", DEFAULT_PATH))
+        if cls.result_cache:
+            # TC_01 also reads the outer page's title, which code.gs sets; the deployed outer HTML may carry per-load tokens
+            cls.form_fingerprint = fingerprint(
+                cls.driver.execute_script("return document.documentElement.outerHTML"), cls.driver.title,
+                cls.backend_version(),
+            )
+        if cls.tracer:
+            cls.tracer.end_test()
+
+    @classmethod
+    def backend_version(cls):
+        # The deployment URL changes with each new deployment; set ATTENDANCE_BACKEND_VERSION when code.gs is updated in place
+        version = os.environ.get("ATTENDANCE_BACKEND_VERSION")
+        if version:
+            return version
+        if cls.local_server:
+            return file_fingerprint(inspect.getsourcefile(LocalAttendanceServer))
+        return cls.app_url
+
+    @classmethod
+    def enter_app_frames(cls):
+        # Switch to sandboxFrame
+        WebDriverWait(cls.driver, 30).until(
+            EC.presence_of_element_located((By.ID, "sandboxFrame"))
+        )
+        iframe1 = cls.driver.find_element(By.ID, "sandboxFrame")
+        cls.driver.switch_to.frame(iframe1)
+        # Switch to userHtmlFrame
+        WebDriverWait(cls.driver, 30).until(
+            EC.presence_of_element_located((By.ID, "userHtmlFrame"))
+        )
+        iframe2 = cls.driver.find_element(By.ID, "userHtmlFrame")
+        cls.driver.switch_to.frame(iframe2)
+        # Now wait for the form inside the second iframe
+        WebDriverWait(cls.driver, 30).until(
+            EC.presence_of_element_located((By.ID, "attendanceForm"))
+        )
 
     @classmethod
     def tearDownClass(cls):
+        tracer = getattr(cls, 'tracer', None)
+        if tracer:
+            tracer.begin_test("tearDownClass")
         if hasattr(cls, 'driver'):
-            cls.driver.quit()
+            get_pool().release(cls.driver)
+        if tracer:
+            tracer.end_test()
+            tracer.detach(cls.driver)
+        if getattr(cls, 'local_server', None):
+            cls.local_server.stop()
 
     def setUp(self):
+        if self.tracer:
+            self.tracer.begin_test(self._testMethodName)
+        self.waits.test_id = self._testMethodName
+        if self.RESET_MODE == "inplace" and self.reset_form_in_place():
+            return
+        self.reload_form()
+
+    def reload_form(self):
         self.driver.get(self.app_url)
         try:
-            WebDriverWait(self.driver, 30).until(
-                EC.presence_of_element_located((By.ID, "sandboxFrame"))
-            )
-            iframe1 = self.driver.find_element(By.ID, "sandboxFrame")
-            self.driver.switch_to.frame(iframe1)
-            WebDriverWait(self.driver, 30).until(
-                EC.presence_of_element_located((By.ID, "userHtmlFrame"))
-            )
-            iframe2 = self.driver.find_element(By.ID, "userHtmlFrame")
-            self.driver.switch_to.frame(iframe2)
-            WebDriverWait(self.driver, 30).until(
-                EC.presence_of_element_located((By.ID, "attendanceForm"))
-            )
+            self.enter_app_frames()
         except Exception as e:
-            self.driver.save_screenshot("debug_page_error_setup.png")
-            print("=== PAGE SOURCE ON ERROR IN setUp ===")
-            print(self.driver.page_source)
+            get_collector().capture(self.driver, self._testMethodName, f"setUp: {e}")
             print(f"ERROR: Could not find attendanceForm in setUp after 30 seconds: {e}")
             raise
         self.clear_form()
 
+    def tearDown(self):
+        # Screenshot, frame DOMs and console log, only for tests that failed
+        if self.has_failed():
+            get_collector().capture(self.driver, self._testMethodName, "failed")
+        if self.tracer:
+            self.tracer.end_test("failed" if self.has_failed() else "ok")
+
+    def has_failed(self):
+        """True in tearDown if the test failed or errored (_outcome.success is reset before tearDown runs)"""
+        outcome = self._outcome
+        if hasattr(outcome, "errors"):
+            # Python < 3.11 collects the test's errors on the outcome until it finishes
+            return any(exc_info for test, exc_info in outcome.errors if test is self)
+        result = outcome.result
+        return any(test is self for test, _ in result.errors + result.failures)
+
+    def reset_form_in_place(self):
+        try:
+            return self.driver.execute_script(self.RESET_FORM_SCRIPT) is True
+        except WebDriverException:
+            # Stale frame or navigated away; the caller falls back to a full reload
+            return False
+
     def clear_form(self):
         # Clear all input fields
-        for field_id in ["Email", "Name", "Description", "Latitude", "Longitude"]:
-            try:
-                field = self.driver.find_element(By.ID, field_id)
+        self.fill_fields({field_id: "" for field_id in self.INPUT_FIELDS}, strict=False)
+
+    def fill_fields(self, values, keystrokes=False, strict=True):
+        """Set any subset of the INPUT_FIELDS; batched into one script call unless keystrokes=True"""
+        unknown = set(values) - set(self.INPUT_FIELDS)
+        if unknown:
+            raise KeyError(f"Not form input fields: {', '.join(sorted(unknown))}")
+        values = dict(values)
+        if keystrokes:
+            # Type into the editable fields like a user would; anything read-only is still set by script
+            for field_id in [field_id for field_id in self.KEYSTROKE_FIELDS if field_id in values]:
+                field_info = self.FORM_FIELDS[field_id]
+                WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((field_info["by"], field_info["value"]))
+                )
+                field = self.driver.find_element(field_info["by"], field_info["value"])
                 field.clear()
-            except Exception:
-                pass
+                field.send_keys(values.pop(field_id))
+            if not values:
+                return
+        missing = self.driver.execute_script(self.FILL_FIELDS_SCRIPT, values)
+        if missing and strict:
+            raise NoSuchElementException(f"Form fields not found: {', '.join(missing)}")
 
-    def fill_form(self, student_data, get_location=False):
+    def fill_form(self, student_data, get_location=False, keystrokes=False):
         print("Filling form with:", student_data)
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.ID, "Email"))
-        )
-        email_field = self.driver.find_element(By.ID, "Email")
-        email_field.clear()
-        email_field.send_keys(student_data["Email"])
-
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.ID, "Name"))
-        )
-        name_field = self.driver.find_element(By.ID, "Name")
-        name_field.clear()
-        name_field.send_keys(student_data["Name"])
-
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.ID, "Description"))
-        )
-        desc_field = self.driver.find_element(By.ID, "Description")
-        desc_field.clear()
-        desc_field.send_keys(student_data["Description"])
+        field_ids = ["Email", "Name", "Description"]
+        if not get_location:
+            field_ids += [field_id for field_id in ("Latitude", "Longitude") if field_id in student_data]
+        self.fill_fields({field_id: student_data[field_id] for field_id in field_ids}, keystrokes=keystrokes)
 
         if get_location:
             WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.ID, "locationBtn"))
             )
             self.driver.find_element(By.ID, "locationBtn").click()
-            time.sleep(2)
+            self.waits.location_filled()
+
+    def cache_key(self):
+        return fingerprint(self.form_fingerprint, inspect.getsource(getattr(self, self._testMethodName)))
+
+    def replay_cached_result(self, test_id, test_name):
+        """Record the stored verdict and return True if this check already passed against the same form and backend"""
+        if not self.result_cache or self._testMethodName not in self.CACHEABLE_TESTS:
+            return False
+        entry = self.result_cache.lookup(test_id, self.cache_key())
+        if entry is None:
+            return False
+        print(f"{test_id}: {entry['status']} from the result cache (verified {entry['verified_at']})")
+        self.__class__.record_test_result(test_id, test_name, entry["status"], f"{CACHE_HIT}, verified {entry['verified_at']}")
+        return True
+
+    def cache_result(self, test_id):
+        """Store a pass for the next run; returns the comment to record with it"""
+        if not self.result_cache or self._testMethodName not in self.CACHEABLE_TESTS:
+            return ""
+        self.result_cache.store(test_id, self.cache_key())
+        return CACHE_MISS
 
     def is_element_present(self, by, value):
         try:
@@ -178,16 +334,20 @@ class AttendanceSystemTests(unittest.TestCase):
             return False
     
     def test_01_page_loads_correctly(self):
+        if self.replay_cached_result("TC_01", "Page Loading Test"):
+            return
         try:
             self.assertIn("Attendance Tracking System", self.driver.title)
             form_present = self.is_element_present(By.ID, "attendanceForm")
             self.assertTrue(form_present, "Form not found on page")
-            self.__class__.record_test_result("TC_01", "Page Loading Test", "PASS")
+            self.__class__.record_test_result("TC_01", "Page Loading Test", "PASS", self.cache_result("TC_01"))
         except AssertionError as e:
             self.__class__.record_test_result("TC_01", "Page Loading Test", "FAIL", str(e))
             raise
 
     def test_02_form_elements_exist(self):
+        if self.replay_cached_result("TC_02", "Form Elements Test"):
+            return
         try:
             self.assertTrue(self.is_element_present(By.ID, "Email"), "Email field not found")
             self.assertTrue(self.is_element_present(By.ID, "Name"), "Name field not found")
@@ -197,7 +357,7 @@ class AttendanceSystemTests(unittest.TestCase):
             self.assertTrue(self.is_element_present(By.ID, "locationBtn"), "Get Location button not found")
             self.assertTrue(self.is_element_present(By.XPATH, self.FORM_FIELDS["signIn"]["value"]), "Sign In button not found")
             self.assertTrue(self.is_element_present(By.XPATH, self.FORM_FIELDS["signOut"]["value"]), "Sign Out button not found")
-            self.__class__.record_test_result("TC_02", "Form Elements Test", "PASS")
+            self.__class__.record_test_result("TC_02", "Form Elements Test", "PASS", self.cache_result("TC_02"))
         except AssertionError as e:
             self.__class__.record_test_result("TC_02", "Form Elements Test", "FAIL", str(e))
             raise
@@ -206,10 +366,10 @@ class AttendanceSystemTests(unittest.TestCase):
         try:
             student_data = self.TEST_STUDENTS[0]
             self.fill_form(student_data, get_location=True)
-            self.driver.find_element(By.XPATH, self.FORM_FIELDS["signIn"]["value"]).click()
-            time.sleep(2)
-            status_div = self.driver.find_element(By.ID, "status")
-            status_text = status_div.text.lower()
+            sign_in = self.driver.find_element(By.XPATH, self.FORM_FIELDS["signIn"]["value"])
+            status_text = self.waits.status_after(
+                sign_in.click, expected=["success", "processing", "location captured"]
+            ).lower()
             # Check for any status message (success, processing, or location captured)
             self.assertTrue(
                 any(msg in status_text for msg in ["success", "processing", "location captured"]),
@@ -224,10 +384,10 @@ class AttendanceSystemTests(unittest.TestCase):
         try:
             student_data = self.TEST_STUDENTS[1]
             self.fill_form(student_data, get_location=True)
-            self.driver.find_element(By.XPATH, self.FORM_FIELDS["signOut"]["value"]).click()
-            time.sleep(2)
-            status_div = self.driver.find_element(By.ID, "status")
-            status_text = status_div.text.lower()
+            sign_out = self.driver.find_element(By.XPATH, self.FORM_FIELDS["signOut"]["value"])
+            status_text = self.waits.status_after(
+                sign_out.click, expected=["success", "no active login", "processing"]
+            ).lower()
             # Check for any status message (success, no active login, or processing)
             self.assertTrue(
                 any(msg in status_text for msg in ["success", "no active login", "processing"]),
@@ -240,10 +400,8 @@ class AttendanceSystemTests(unittest.TestCase):
 
     def test_05_sign_in_requires_email_and_name(self):
         try:
-            self.driver.find_element(By.XPATH, self.FORM_FIELDS["signIn"]["value"]).click()
-            time.sleep(1)
-            status_div = self.driver.find_element(By.ID, "status")
-            status_text = status_div.text.lower()
+            button = self.driver.find_element(By.XPATH, self.FORM_FIELDS["signIn"]["value"])
+            status_text = self.waits.status_after(button.click, expected=["email", "name"]).lower()
             self.assertTrue("email" in status_text or "name" in status_text, "Sign In did not show error for missing Email or Name")
             self.__class__.record_test_result("TC_05", "Sign In Empty Fields Test", "PASS")
         except AssertionError as e:
@@ -252,10 +410,8 @@ class AttendanceSystemTests(unittest.TestCase):
 
     def test_06_sign_out_requires_email_and_name(self):
         try:
-            self.driver.find_element(By.XPATH, self.FORM_FIELDS["signOut"]["value"]).click()
-            time.sleep(1)
-            status_div = self.driver.find_element(By.ID, "status")
-            status_text = status_div.text.lower()
+            button = self.driver.find_element(By.XPATH, self.FORM_FIELDS["signOut"]["value"])
+            status_text = self.waits.status_after(button.click, expected=["email", "name"]).lower()
             self.assertTrue("email" in status_text or "name" in status_text, "Sign Out did not show error for missing Email or Name")
             self.__class__.record_test_result("TC_06", "Sign Out Empty Fields Test", "PASS")
         except AssertionError as e:
@@ -265,9 +421,7 @@ class AttendanceSystemTests(unittest.TestCase):
     def test_07_get_location_button_updates_fields(self):
         try:
             self.driver.find_element(By.ID, "locationBtn").click()
-            time.sleep(3)
-            latitude = self.driver.find_element(By.ID, "Latitude").get_attribute("value")
-            longitude = self.driver.find_element(By.ID, "Longitude").get_attribute("value")
+            latitude, longitude = self.waits.location_filled()
             self.assertTrue(latitude != "" and longitude != "", "Latitude and Longitude fields were not updated after clicking 'Get Location'")
             self.__class__.record_test_result("TC_07", "Get Location Updates Fields Test", "PASS")
         except AssertionError as e:
@@ -279,10 +433,8 @@ class AttendanceSystemTests(unittest.TestCase):
             student_data = self.TEST_STUDENTS[0].copy()
             student_data["Email"] = "invalid-email"  # Invalid email
             self.fill_form(student_data, get_location=True)
-            self.driver.find_element(By.XPATH, self.FORM_FIELDS["signIn"]["value"]).click()
-            time.sleep(1)
-            status_div = self.driver.find_element(By.ID, "status")
-            status_text = status_div.text.lower()
+            sign_in = self.driver.find_element(By.XPATH, self.FORM_FIELDS["signIn"]["value"])
+            status_text = self.waits.status_after(sign_in.click, expected=["email"]).lower()
             self.assertIn("email", status_text, "Email validation error message not found")
             self.__class__.record_test_result("TC_08", "Invalid Email Validation", "PASS")
         except AssertionError as e:
@@ -294,10 +446,8 @@ class AttendanceSystemTests(unittest.TestCase):
             student_data = self.TEST_STUDENTS[0].copy()
             student_data["Name"] = ""  # Missing name
             self.fill_form(student_data, get_location=True)
-            self.driver.find_element(By.XPATH, self.FORM_FIELDS["signIn"]["value"]).click()
-            time.sleep(1)
-            status_div = self.driver.find_element(By.ID, "status")
-            status_text = status_div.text.lower()
+            sign_in = self.driver.find_element(By.XPATH, self.FORM_FIELDS["signIn"]["value"])
+            status_text = self.waits.status_after(sign_in.click, expected=["name"]).lower()
             self.assertIn("name", status_text, "Name validation error message not found")
             self.__class__.record_test_result("TC_09", "Missing Name Validation", "PASS")
         except AssertionError as e:
@@ -310,10 +460,8 @@ class AttendanceSystemTests(unittest.TestCase):
             student_data["Latitude"] = "999"  # Invalid latitude
             student_data["Longitude"] = "999"  # Invalid longitude
             self.fill_form(student_data, get_location=False)
-            self.driver.find_element(By.XPATH, self.FORM_FIELDS["signIn"]["value"]).click()
-            time.sleep(1)
-            status_div = self.driver.find_element(By.ID, "status")
-            status_text = status_div.text.lower()
+            sign_in = self.driver.find_element(By.XPATH, self.FORM_FIELDS["signIn"]["value"])
+            status_text = self.waits.status_after(sign_in.click, expected=["location"]).lower()
             self.assertIn("location", status_text, "Location validation error message not found")
             self.__class__.record_test_result("TC_10", "Invalid Location Validation", "PASS")
         except AssertionError as e:
@@ -322,45 +470,88 @@ class AttendanceSystemTests(unittest.TestCase):
 
     def test_11_page_load_performance(self):
         try:
-            start_time = time.time()
-            self.driver.get(self.app_url)
-            try:
-                WebDriverWait(self.driver, 30).until(
-                    EC.presence_of_element_located((By.ID, "sandboxFrame"))
-                )
-                iframe1 = self.driver.find_element(By.ID, "sandboxFrame")
-                self.driver.switch_to.frame(iframe1)
-                WebDriverWait(self.driver, 30).until(
-                    EC.presence_of_element_located((By.ID, "userHtmlFrame"))
-                )
-                iframe2 = self.driver.find_element(By.ID, "userHtmlFrame")
-                self.driver.switch_to.frame(iframe2)
-                WebDriverWait(self.driver, 30).until(
-                    EC.presence_of_element_located((By.ID, "attendanceForm"))
-                )
-            except Exception as e:
-                self.driver.save_screenshot("debug_page_error_performance.png")
-                print("=== PAGE SOURCE ON ERROR IN test_11_page_load_performance ===")
-                print(self.driver.page_source)
-                print(f"ERROR: Could not find attendanceForm in test_11_page_load_performance after 30 seconds: {e}")
-                raise
-            end_time = time.time()
-            load_time = end_time - start_time
-            threshold = 5.0
-            if load_time <= threshold:
-                self.__class__.record_test_result("TC_11", "Page Load Performance Test", "PASS", f"Load time: {load_time:.2f}s (Threshold: {threshold}s)")
+            stats = run_benchmark(self.driver, self.app_url, self.PERF_SAMPLES)
+            load_time = stats["wall"]["p50"] / 1000
+            samples = f"median of {self.PERF_SAMPLES}, p95 {stats['wall']['p95'] / 1000:.2f}s"
+            baseline = load_baseline("local" if self.local_server else self.app_url)
+            if baseline is None:
+                # No stored baseline for this target yet: fall back to the fixed threshold
+                threshold = 5.0
+                if load_time <= threshold:
+                    self.__class__.record_test_result("TC_11", "Page Load Performance Test", "PASS", f"Load time: {load_time:.2f}s ({samples}, Threshold: {threshold}s)")
+                else:
+                    self.__class__.record_test_result("TC_11", "Page Load Performance Test", "FAIL", f"Load time: {load_time:.2f}s exceeds threshold of {threshold}s ({samples})")
+                return
+            regressions = [
+                f"{row['metric']} {row['stat']} {row['change_pct']:+.0f}%"
+                for row in compare_to_baseline(stats, baseline, self.PERF_REGRESSION_PCT)
+                if row["regression"]
+            ]
+            if not regressions:
+                self.__class__.record_test_result("TC_11", "Page Load Performance Test", "PASS", f"Load time: {load_time:.2f}s ({samples}, within {self.PERF_REGRESSION_PCT:.0f}% of baseline)")
             else:
-                self.__class__.record_test_result("TC_11", "Page Load Performance Test", "FAIL", f"Load time: {load_time:.2f}s exceeds threshold of {threshold}s")
+                self.__class__.record_test_result("TC_11", "Page Load Performance Test", "FAIL", f"Load time: {load_time:.2f}s ({samples}); regressed vs baseline: {', '.join(regressions)}")
         except Exception as e:
             self.__class__.record_test_result("TC_11", "Page Load Performance Test", "FAIL", str(e))
             raise
 
+    def test_12_validation_matches_engine(self):
+        if not self.local_server:
+            # The engine holds the stand-in's rules, and fuzzed records must not reach the production sheet
+            self.skipTest("Validation parity is only checked against the local stand-in (ATTENDANCE_APP_URL=local)")
+        try:
+            mismatches = []
+            for index, record in enumerate(fuzz_records(self.FUZZ_SAMPLES, self.FUZZ_SEED)):
+                if index and not self.reset_form_in_place():
+                    self.reload_form()
+                self.fill_fields(record)
+                stored = self.driver.execute_script(self.READ_FIELDS_SCRIPT, list(record))
+                code = validate_record(stored)
+                if code is None and self.geofence and self.geofence.lookup(*coordinates(stored)) is None:
+                    # Passes the stand-in's form rules but its backend rejects it as outside every site
+                    code = "outside every site"
+                    expected = ["location"]
+                else:
+                    expected = list(STATUS_KEYWORDS[code]) if code else ["successful", "error"]
+                sign_in = self.driver.find_element(By.XPATH, self.FORM_FIELDS["signIn"]["value"])
+                status_text = self.waits.status_after(sign_in.click, expected=expected)
+                if code:
+                    matched = any(keyword in status_text.lower() for keyword in expected)
+                else:
+                    matched = status_text and status_text not in MESSAGES.values()
+                if not matched:
+                    mismatches.append(f"{stored!r}: expected {code or 'accepted'}, form showed {status_text!r}")
+            self.assertFalse(mismatches, "Form disagrees with the validation engine: " + "; ".join(mismatches))
+            self.__class__.record_test_result("TC_12", "Validation Matches Engine", "PASS", f"{self.FUZZ_SAMPLES} fuzzed submissions (seed {self.FUZZ_SEED})")
+        except AssertionError as e:
+            self.__class__.record_test_result("TC_12", "Validation Matches Engine", "FAIL", str(e))
+            raise
+
+    def test_13_sign_in_outside_geofence(self):
+        if not self.geofence:
+            self.skipTest("Geofencing is only checked against the local stand-in (ATTENDANCE_APP_URL=local)")
+        try:
+            student_data = self.TEST_STUDENTS[0].copy()
+            # A valid coordinate well away from every site
+            student_data["Latitude"] = "0"
+            student_data["Longitude"] = "0"
+            self.assertIsNone(self.geofence.lookup(0.0, 0.0), "Test point falls inside a configured site")
+            self.fill_form(student_data, get_location=False)
+            sign_in = self.driver.find_element(By.XPATH, self.FORM_FIELDS["signIn"]["value"])
+            status_text = self.waits.status_after(sign_in.click, expected=["location", "successful"])
+            self.assertEqual(status_text, f"Error: {OUTSIDE_MESSAGE}", "Sign-in outside every site was not rejected")
+            self.__class__.record_test_result("TC_13", "Sign In Outside Geofence", "PASS")
+        except AssertionError as e:
+            self.__class__.record_test_result("TC_13", "Sign In Outside Geofence", "FAIL", str(e))
+            raise
+
     @classmethod
     def record_test_result(cls, test_id, test_name, status, comments=""):
         if status not in ["PASS", "FAIL"]:
             status = "FAIL"
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        cls.test_results.append({
+        sink = cls.result_sink or cls.open_result_sink()
+        sink.write({
             "Test ID": test_id,
             "Test Name": test_name,
             "Status": status,
@@ -368,85 +559,79 @@ class AttendanceSystemTests(unittest.TestCase):
             "Comments": comments
         })
 
+    @classmethod
+    def open_result_sink(cls, prefix=None):
+        if cls.result_sink:
+            cls.result_sink.close()
+        prefix = prefix or f"attendance_test_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        cls.result_sink = ResultSink(prefix, fsync=os.environ.get("ATTENDANCE_RESULTS_FSYNC") == "1")
+        return cls.result_sink
+
     @classmethod
     def export_test_results(cls):
-        filename = f"attendance_test_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        with open(filename, 'w', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=["Test ID", "Test Name", "Status", "Timestamp", "Comments"])
-            writer.writeheader()
-            for row in cls.test_results:
-                if row["Test ID"] != "SUMMARY":
-                    writer.writerow(row)
-        print(f"Test results exported to {filename}")
-        return filename
+        # The CSV has been written row by row as results were recorded
+        sink = cls.result_sink or cls.open_result_sink()
+        sink.csv_file.flush()
+        print(f"Test results exported to {sink.csv_path}")
+        return sink.csv_path
 
     @classmethod
     def export_html_report(cls):
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Attendance System Test Results</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                h1 {{ color: #333; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; }}
-                th {{ background-color: #f2f2f2; }}
-                .pass {{ background-color: #dff0d8; }}
-                .fail {{ background-color: #f2dede; }}
-            </style>
-        </head>
-        <body>
-            <h1>Attendance System Test Results</h1>
-            <p>Execution Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            <table>
-                <tr>
-                    <th>Test ID</th>
-                    <th>Test Name</th>
-                    <th>Status</th>
-                    <th>Timestamp</th>
-                    <th>Comments</th>
-                </tr>
-        """
-        for result in cls.test_results:
-            if result["Test ID"] == "SUMMARY":
-                continue
-            status_class = result["Status"].lower()
-            row_class = "pass" if status_class == "pass" else "fail"
-            html_content += f"""
-                <tr class=\"{row_class}\">
-                    <td>{result['Test ID']}</td>
-                    <td>{result['Test Name']}</td>
-                    <td>{result['Status']}</td>
-                    <td>{result['Timestamp']}</td>
-                    <td>{result['Comments']}</td>
-                </tr>
-            """
-        html_content += """
-            </table>
-        </body>
-        </html>
-        """
-        filename = f"attendance_test_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        with open(filename, 'w', encoding='utf-8') as file:
-            file.write(html_content)
+        sink = cls.result_sink or cls.open_result_sink()
+        filename = write_html_report(f"{sink.prefix}.html", lambda: iter_results(sink.jsonl_path))
         print(f"HTML report generated: {filename}")
         return filename
 
-def run_tests():
-    test_suite = unittest.TestLoader().loadTestsFromTestCase(AttendanceSystemTests)
-    test_runner = unittest.TextTestRunner(verbosity=2)
-    test_result = test_runner.run(test_suite)
+def finish_run(tests_run, failures, errors):
     AttendanceSystemTests.record_test_result(
         "SUMMARY",
         "Test Execution Summary",
         "INFO",
-        f"Total: {test_result.testsRun}, Passed: {test_result.testsRun - len(test_result.failures) - len(test_result.errors)}, "
-        f"Failed: {len(test_result.failures)}, Errors: {len(test_result.errors)}"
+        f"Total: {tests_run}, Passed: {tests_run - failures - errors}, "
+        f"Failed: {failures}, Errors: {errors}"
     )
+    for name, stats in get_pool().report().items():
+        print(f"WebDriver {name}: {stats['count']}x, p50 {stats['p50']:.2f}s, max {stats['max']:.2f}s")
+    for condition, stats in FormWaits(None, AttendanceSystemTests.wait_timings).summary().items():
+        print(f"Waited on {condition}: {stats['count']} waits, {stats['total']:.2f}s total, "
+              f"{stats['max']:.2f}s max, {stats['timeouts']} timed out")
     AttendanceSystemTests.export_test_results()
     AttendanceSystemTests.export_html_report()
+    tracer = get_tracer()
+    if tracer:
+        for row in tracer.summary():
+            test, wall, commands, command_time, command_errors, waits, wait_time, other, slowest = row
+            print(f"Trace {test}: {wall:.2f}s, {commands} commands {command_time:.2f}s ({command_errors} failed), "
+                  f"{waits} WebDriverWaits {wait_time:.2f}s, other {other:.2f}s, slowest {slowest or '-'}")
+        prefix = AttendanceSystemTests.result_sink.prefix
+        tracer.export_summary(f"{prefix}.trace_summary.csv")
+        print(f"Trace written to {tracer.export_trace(f'{prefix}.trace.json')} (chrome://tracing or ui.perfetto.dev)")
+    cached = [result["Test ID"] for result in iter_results(AttendanceSystemTests.result_sink.jsonl_path)
+              if result["Comments"].startswith(CACHE_HIT)]
+    if cached:
+        print(f"Reused cached verdicts for {', '.join(cached)} (run with --no-cache to re-check)")
+    collector = get_collector()
+    collector.flush()
+    # Read from the shared index, so a parallel run also counts what its workers captured
+    captured = collector.entries(run=collector.run_id)
+    if captured:
+        print(f"Debug artifacts for {len(captured)} failures in {os.path.join(collector.root, collector.run_id)}")
+    index_path = os.environ.get("ATTENDANCE_RESULTS_INDEX")
+    if index_path:
+        indexed = ingest_stream(AttendanceSystemTests.result_sink.jsonl_path, index_path)
+        print(f"Indexed {indexed} results into {index_path}")
+
+def run_tests():
+    test_suite = unittest.TestLoader().loadTestsFromTestCase(AttendanceSystemTests)
+    test_runner = unittest.TextTestRunner(verbosity=2)
+    test_result = test_runner.run(test_suite)
+    finish_run(test_result.testsRun, len(test_result.failures), len(test_result.errors))
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the attendance system browser tests")
+    parser.add_argument("--no-cache", action="store_true", help="Re-run the structural checks instead of reusing cached verdicts")
+    args = parser.parse_args()
+    if args.no_cache:
+        os.environ["ATTENDANCE_RESULT_CACHE"] = "none"
     run_tests()
\ No newline at end of file
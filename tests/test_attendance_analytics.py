@@ -0,0 +1,148 @@
+#cd tests
+#python -m unittest test_attendance_analytics
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from attendance_analytics import AttendanceAnalytics, parse_clock
+from roster_generator import COLUMNS, RosterGenerator
+
+
+def reference_rollups(rows, late_after):
+    """Straightforward whole-file version of the per-day and per-person rollups"""
+    days, people = {}, {}
+    for row in rows:
+        login, logout = parse_clock(row["Login"]), parse_clock(row["Logout"])
+        if login is None or not row["Email"] or not row["Date"]:
+            continue
+        day = days.setdefault(row["Date"], {"people": set(), "sessions": 0, "minutes": 0.0, "late": 0, "unmatched": 0})
+        person = people.setdefault(row["Email"], {"days": set(), "sessions": 0, "minutes": 0.0, "late": 0, "unmatched": 0})
+        for stats in (day, person):
+            stats["sessions"] += 1
+            stats["late"] += login > late_after
+            stats["unmatched"] += logout is None
+            if logout is not None:
+                stats["minutes"] += (logout - login) % 1440
+        day["people"].add(row["Email"])
+        person["days"].add(row["Date"])
+    return days, people
+
+
+class AttendanceAnalyticsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "export.csv")
+        columns = RosterGenerator(students=300, seed=7, missing_logout_rate=0.2).chunk(0, 0, 3000)
+        self.rows = [dict(zip(COLUMNS, values)) for values in zip(*(columns[name] for name in COLUMNS))]
+        self.rows[5]["Description"] = 'Said "hi",\nthen left'
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, rows, mode="w", header=True, tail=""):
+        with open(self.path, mode, newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, COLUMNS)
+            if header:
+                writer.writeheader()
+            writer.writerows(rows)
+            file.write(tail)
+
+    def test_parse_clock(self):
+        self.assertEqual(parse_clock("09:05"), 545)
+        self.assertEqual(parse_clock("9:05:30"), 545.5)
+        self.assertEqual(parse_clock("12:15 AM"), 15)
+        self.assertEqual(parse_clock("1:00 pm"), 780)
+        for value in ("", "25:00", "9", "13:00 PM", "ab:cd"):
+            self.assertIsNone(parse_clock(value), value)
+
+    def test_matches_reference(self):
+        self.write(self.rows)
+        analytics = AttendanceAnalytics("09:00", 5)
+        analytics.update([self.path], chunk_bytes=4096)
+        days, people = reference_rollups(self.rows, analytics.late_after)
+        self.assertEqual(sorted(analytics.days), sorted(days))
+        for date, (people_count, sessions, minutes, late, unmatched) in analytics.days.items():
+            expected = days[date]
+            self.assertEqual((people_count, sessions, late, unmatched),
+                             (len(expected["people"]), expected["sessions"], expected["late"], expected["unmatched"]))
+            self.assertAlmostEqual(minutes, expected["minutes"])
+        for email, person in analytics.people.items():
+            expected = people[email]
+            self.assertEqual(person[1:3] + person[4:6],
+                             [len(expected["days"]), expected["sessions"], expected["late"], expected["unmatched"]])
+            self.assertAlmostEqual(person[3], expected["minutes"])
+
+    def test_incremental_update_matches_full_run(self):
+        full = AttendanceAnalytics()
+        self.write(self.rows)
+        full.update([self.path])
+
+        # First run sees half the export plus a partly written line, which must wait for the rest
+        half = len(self.rows) // 2
+        self.write(self.rows[:half], tail="2026-01-01,partial@exam")
+        state = os.path.join(self.directory, "state.json")
+        first = AttendanceAnalytics()
+        self.assertEqual(first.update([self.path], chunk_bytes=4096), half)
+        first.save(state)
+
+        self.write(self.rows[:half])
+        self.write(self.rows[half:], mode="a", header=False)
+        resumed = AttendanceAnalytics.load(state)
+        self.assertFalse(resumed.needs_rebuild([self.path]))
+        self.assertEqual(resumed.update([self.path], chunk_bytes=4096), len(self.rows) - half)
+        self.assertEqual(list(resumed.daily_rows()), list(full.daily_rows()))
+        self.assertEqual(list(resumed.people_rows()), list(full.people_rows()))
+        self.assertEqual(resumed.update([self.path]), 0)
+
+    def test_last_row_without_line_break(self):
+        # Sheets CSV downloads do not end with a line break
+        self.write(self.rows[:100])
+        with open(self.path, "rb") as file:
+            data = file.read()
+        with open(self.path, "wb") as file:
+            file.write(data.rstrip(b"\r\n"))
+        analytics = AttendanceAnalytics()
+        self.assertEqual(analytics.update([self.path], chunk_bytes=1024), 100)
+        self.assertEqual(analytics.update([self.path]), 0)
+
+        # A later download with more rows resumes after the one already counted
+        self.write(self.rows[:120])
+        self.assertFalse(analytics.needs_rebuild([self.path]))
+        self.assertEqual(analytics.update([self.path]), 20)
+
+    def test_sign_out_in_processed_rows_needs_rebuild(self):
+        rows = [dict(row) for row in self.rows[:600]]
+        self.write(rows[:500])
+        analytics = AttendanceAnalytics()
+        analytics.update([self.path])
+        # A sign-out fills in the Logout of a row past the digested head of the file
+        blank = next(index for index in range(100, 500) if not rows[index]["Logout"])
+        rows[blank]["Logout"] = "17:00"
+        self.write(rows[:500])
+        self.write(rows[500:], mode="a", header=False)
+        self.assertTrue(analytics.needs_rebuild([self.path]))
+        full = AttendanceAnalytics()
+        full.update([self.path])
+        self.assertEqual(full.skipped, 0)
+
+    def test_replaced_export_needs_rebuild(self):
+        self.write(self.rows)
+        analytics = AttendanceAnalytics()
+        analytics.update([self.path])
+        self.write(self.rows[10:])
+        self.assertTrue(analytics.needs_rebuild([self.path]))
+
+    def test_settings_change_discards_state(self):
+        self.write(self.rows)
+        state = os.path.join(self.directory, "state.json")
+        analytics = AttendanceAnalytics("09:00")
+        analytics.update([self.path])
+        analytics.save(state)
+        self.assertEqual(AttendanceAnalytics.load(state, "09:00").rows, len(self.rows))
+        self.assertEqual(AttendanceAnalytics.load(state, "09:30").rows, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
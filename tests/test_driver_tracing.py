@@ -0,0 +1,105 @@
+#cd tests
+#python -m unittest test_driver_tracing
+import shutil
+import tempfile
+import unittest
+import artifacts
+import test_attendance
+from driver_tracing import CATEGORY, END, NAME, OUTCOME, START, CommandTracer
+from test_artifacts import FakeDriver as CaptureDriver
+
+
+class FakeDriver:
+    """Stands in for a WebDriver: every command goes through `execute`, as in Selenium"""
+
+    def __init__(self, failing=()):
+        self.failing = failing
+        self.commands = []
+
+    def execute(self, driver_command, params=None):
+        self.commands.append(driver_command)
+        if driver_command in self.failing:
+            raise RuntimeError(driver_command)
+        return {"value": None}
+
+
+class CommandTracerTests(unittest.TestCase):
+
+    def test_summary_splits_commands_waits_and_other_time(self):
+        tracer = CommandTracer()
+        driver = tracer.attach(FakeDriver(failing=("findElement",)))
+        tracer.begin_test("test_03")
+        driver.execute("get", {"url": "http://localhost/exec"})
+        with tracer.span("FormWaits.status", "wait", "status"):
+            driver.execute("executeAsyncScript")
+        with self.assertRaises(RuntimeError):
+            driver.execute("findElement", {"value": "Email"})
+        tracer.end_test("failed")
+        tracer.detach(driver)
+        self.assertNotIn("execute", driver.__dict__)
+
+        [row] = tracer.summary()
+        test, wall, commands, command_time, errors, waits, wait_time, other, slowest = row
+        self.assertEqual((test, commands, errors, waits), ("test_03", 3, 1, 1))
+        self.assertGreaterEqual(wall, command_time)
+        self.assertTrue(slowest)
+        [test_event] = [event for event in tracer.events if event[CATEGORY] == "test"]
+        self.assertEqual(test_event[OUTCOME], "failed")
+        self.assertEqual(set(tracer.command_stats()), {"get", "executeAsyncScript", "findElement"})
+
+    def test_merge_round_trip_keeps_wall_clock_times(self):
+        worker = CommandTracer()
+        driver = worker.attach(FakeDriver())
+        worker.begin_test("test_01")
+        driver.execute("getTitle")
+        worker.end_test()
+        parent = CommandTracer()
+        parent.merge(worker.portable_events())
+        self.assertEqual(len(parent.events), len(worker.events))
+        for original, merged in zip(worker.events, parent.events):
+            self.assertEqual(merged[:START], original[:START])
+            self.assertEqual(merged[OUTCOME], original[OUTCOME])
+            # Same moment on the wall clock, whichever process's perf counter it was taken on
+            self.assertEqual(parent.epoch_ns + merged[START], worker.epoch_ns + original[START])
+            self.assertEqual(merged[END] - merged[START], original[END] - original[START])
+        trace = parent.trace_events()
+        self.assertEqual({event["name"] for event in trace}, {"getTitle", "test_01"})
+        self.assertEqual(len({event["tid"] for event in trace}), 1)
+        self.assertEqual(parent.summary()[0][0], "test_01")
+
+    def test_failed_test_is_traced_as_failed(self):
+        tracer = CommandTracer()
+        # tearDown also captures artifacts for the failed test; keep them out of the working directory
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        previous, artifacts._shared_collector = artifacts._shared_collector, artifacts.ArtifactCollector(root)
+        self.addCleanup(setattr, artifacts, "_shared_collector", previous)
+
+        class Tests(test_attendance.AttendanceSystemTests):
+            driver = CaptureDriver()
+
+            @classmethod
+            def setUpClass(cls):
+                cls.tracer = tracer
+
+            @classmethod
+            def tearDownClass(cls):
+                pass
+
+            def setUp(self):
+                self.tracer.begin_test(self._testMethodName)
+
+            def test_fails(self):
+                self.fail("status not shown")
+
+            def test_passes(self):
+                pass
+
+        unittest.TestSuite(Tests(name) for name in ("test_fails", "test_passes")).run(unittest.TestResult())
+        artifacts._shared_collector.flush()
+        outcomes = {event[NAME]: event[OUTCOME] for event in tracer.events if event[CATEGORY] == "test"}
+        self.assertEqual(outcomes, {"test_fails": "failed", "test_passes": "ok"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#cd tests
+#python -m unittest test_geofence
+import json
+import os
+import random
+import tempfile
+import unittest
+from geofence import OUTSIDE_MESSAGE, GeofenceIndex, Site, load_geofence
+from local_server import AttendanceBackend
+from validation import coordinates, fuzz_records, validate_record
+
+SITES = [
+    Site("Library", 12.9716, 77.5946, 60),
+    Site("Campus", 12.9716, 77.5946, 400),
+    # An L-shaped (non-convex) building east of the campus
+    Site("Annex", polygon=[(12.970, 77.600), (12.974, 77.600), (12.974, 77.601), (12.971, 77.601),
+                           (12.971, 77.604), (12.970, 77.604)]),
+    Site("Field Station", 12.5678, 78.9012, 150),
+]
+
+
+def random_points(count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        min_lat, min_lng, max_lat, max_lng = rng.choice(SITES).bounds
+        margin = max(max_lat - min_lat, max_lng - min_lng)
+        yield rng.uniform(min_lat - margin, max_lat + margin), rng.uniform(min_lng - margin, max_lng + margin)
+
+
+class GeofenceIndexTests(unittest.TestCase):
+
+    def test_lookups_match_brute_force(self):
+        points = list(random_points(20000))
+        for cell_size in (10, 50, 500):
+            index = GeofenceIndex(SITES, cell_size)
+            for latitude, longitude in points:
+                expected = [site.name for site in SITES if site.contains(latitude, longitude)]
+                self.assertEqual(index.matches(latitude, longitude), expected)
+                self.assertEqual(index.lookup(latitude, longitude), expected[0] if expected else None)
+            latitudes, longitudes = zip(*points)
+            self.assertEqual(index.batch_lookup(latitudes, longitudes), [index.lookup(*point) for point in points])
+
+    def test_polygon_notch_is_outside(self):
+        index = GeofenceIndex(SITES)
+        self.assertEqual(index.lookup(12.9705, 77.6030), "Annex")
+        self.assertIsNone(index.lookup(12.9730, 77.6030))
+
+    def test_batch_accepts_roster_strings(self):
+        index = GeofenceIndex(SITES)
+        names = index.batch_lookup(["12.9716", "999", "", "nan", " 12.5678 "], ["77.5946", "999", "", "1", "78.9012"])
+        self.assertEqual(names, ["Library", None, None, None, "Field Station"])
+
+    def test_out_of_range_values_are_outside(self):
+        index = GeofenceIndex(SITES)
+        self.assertEqual(index.batch_lookup(["1e308", "-inf", "91", "12.9716"], ["0", "0", "77.5946", "1e308"]), [None] * 4)
+        self.assertIsNone(index.lookup(1e308, 1e308))
+        self.assertEqual(index.matches(float("nan"), 0.0), [])
+
+    def test_sites_file_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sites.json")
+            with open(path, "w") as file:
+                json.dump({"sites": [site.to_dict() for site in SITES]}, file)
+            index = load_geofence(path)
+        for latitude, longitude in random_points(2000, seed=1):
+            self.assertEqual(index.lookup(latitude, longitude), GeofenceIndex(SITES).lookup(latitude, longitude))
+        self.assertIsNone(load_geofence("none"))
+
+    def test_backend_rejects_sign_in_outside_sites(self):
+        backend = AttendanceBackend(GeofenceIndex.default())
+        student = {"Email": "john.123@example.com", "Name": "John Smith", "Latitude": "12.9716", "Longitude": "77.5946"}
+        self.assertEqual(backend.sign_in(student), (True, "Sign in successful!"))
+        self.assertEqual(backend.sign_in(dict(student, Latitude="0", Longitude="0")), (False, OUTSIDE_MESSAGE))
+        self.assertEqual(backend.sign_in(dict(student, Latitude="999")), (False, "Invalid location coordinates."))
+
+    def test_backend_trims_coordinates_like_the_form(self):
+        # U+FEFF is whitespace to JS trim() but not to float()
+        backend = AttendanceBackend(GeofenceIndex.default())
+        student = {"Email": "john.123@example.com", "Name": "John Smith", "Latitude": "\ufeff12.9716", "Longitude": "77.5946\u3000"}
+        self.assertEqual(backend.sign_in(student), (True, "Sign in successful!"))
+        self.assertEqual(backend.sign_in(dict(student, Latitude="\ufeff0", Longitude="0\ufeff")), (False, OUTSIDE_MESSAGE))
+
+    def test_every_accepted_fuzz_record_has_coordinates(self):
+        for record in fuzz_records(20000, seed=0):
+            if validate_record(record) is None:
+                latitude, longitude = coordinates(record)
+                self.assertTrue(-90 <= latitude <= 90 and -180 <= longitude <= 180)
+
+
+if __name__ == "__main__":
+    unittest.main()
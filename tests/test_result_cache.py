@@ -0,0 +1,49 @@
+#cd tests
+#python -m unittest test_result_cache
+import os
+import tempfile
+import unittest
+from result_cache import ResultCache, fingerprint, load_result_cache
+
+
+class ResultCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_hit_only_for_the_same_key(self):
+        key = fingerprint("<form></form>", "v1")
+        ResultCache(self.path).store("TC_01", key)
+        cache = ResultCache(self.path)
+        self.assertEqual(cache.lookup("TC_01", key)["status"], "PASS")
+        self.assertIsNone(cache.lookup("TC_01", fingerprint("<form></form>", "v2")))
+        self.assertIsNone(cache.lookup("TC_02", key))
+
+    def test_fingerprint_separates_parts(self):
+        self.assertNotEqual(fingerprint("ab", "c"), fingerprint("a", "bc"))
+
+    def test_stores_from_two_workers_are_merged(self):
+        first, second = ResultCache(self.path), ResultCache(self.path)
+        first.store("TC_01", "a")
+        second.store("TC_02", "b")
+        cache = ResultCache(self.path)
+        self.assertIsNotNone(cache.lookup("TC_01", "a"))
+        self.assertIsNotNone(cache.lookup("TC_02", "b"))
+
+    def test_unreadable_file_is_empty(self):
+        with open(self.path, "w") as file:
+            file.write("{not json")
+        self.assertEqual(ResultCache(self.path).entries, {})
+
+    def test_none_disables(self):
+        self.assertIsNone(load_result_cache("none"))
+        self.assertIsNone(load_result_cache(""))
+        self.assertIsInstance(load_result_cache(self.path), ResultCache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#cd tests
+#python -m unittest test_results_index
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from html_report import write_html_report
+from result_sink import ResultSink
+from results_index import ResultsIndex
+
+
+def result(test_id, status="PASS", comments=""):
+    return {"Test ID": test_id, "Test Name": f"{test_id} test", "Status": status,
+            "Timestamp": "2026-01-01 09:00:00", "Comments": comments}
+
+
+class ResultsIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index = ResultsIndex(os.path.join(self.directory, "results.db"))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    def write_run(self, stamp, results):
+        sink = ResultSink(os.path.join(self.directory, f"attendance_test_results_{stamp}"))
+        for row in results:
+            sink.write(row)
+        sink.close()
+        return sink
+
+    def rows(self):
+        return self.index.connection.execute(
+            "SELECT runs.name, runs.format, r.seq, r.test_id, r.status FROM results r "
+            "JOIN runs ON runs.run_id = r.run_id ORDER BY runs.name, r.seq"
+        ).fetchall()
+
+    def test_csv_is_replaced_by_jsonl(self):
+        sink = self.write_run("20260101_090000", [result("TC_01"), result("TC_02", "FAIL"), result("SUMMARY", "INFO")])
+        self.assertEqual(self.index.ingest_file(sink.csv_path), 2)
+        self.assertEqual(self.index.ingest_file(sink.jsonl_path), 2)
+        self.assertEqual(self.rows(), [("attendance_test_results_20260101_090000", ".jsonl", 0, "TC_01", "PASS"),
+                                       ("attendance_test_results_20260101_090000", ".jsonl", 1, "TC_02", "FAIL")])
+        # A lower-priority copy of an indexed run is ignored
+        self.assertEqual(self.index.ingest_file(sink.csv_path), 0)
+        self.assertEqual(len(self.rows()), 2)
+
+    def test_reingest_adds_no_duplicates(self):
+        self.write_run("20260101_090000", [result("TC_01"), result("TC_02")])
+        self.write_run("20260102_090000", [result("TC_01", "FAIL")])
+        self.assertEqual(self.index.ingest_paths([self.directory]), 3)
+        self.assertEqual(self.index.ingest_paths([self.directory]), 0)
+        self.assertEqual(len(self.rows()), 3)
+
+    def test_other_files_of_a_run_are_ignored(self):
+        sink = self.write_run("20260101_090000", [result("TC_01"), result("TC_02")])
+        os.remove(sink.jsonl_path)
+        for suffix in (".trace_summary.csv", ".worker0.csv", ".worker0.jsonl"):
+            shutil.copy(sink.csv_path, sink.prefix + suffix)
+        self.assertEqual(self.index.ingest_paths([self.directory]), 2)
+        self.assertEqual(self.index.ingest_paths([self.directory]), 0)
+        self.assertEqual({row[1] for row in self.rows()}, {".csv"})
+
+    def test_partial_jsonl_line_waits_for_the_rest(self):
+        sink = self.write_run("20260101_090000", [result("TC_01")])
+        line = json.dumps(result("TC_02")) + "\n"
+        with open(sink.jsonl_path, "a", encoding="utf-8") as file:
+            file.write(line[:20])
+        self.assertEqual(self.index.ingest_file(sink.jsonl_path), 1)
+        with open(sink.jsonl_path, "a", encoding="utf-8") as file:
+            file.write(line[20:])
+            file.write(json.dumps(result("TC_03")) + "\n")
+        self.assertEqual(self.index.ingest_file(sink.jsonl_path), 2)
+        self.assertEqual([row[3] for row in self.rows()], ["TC_01", "TC_02", "TC_03"])
+
+    def test_html_reports(self):
+        results = [result("TC_01"), result("TC_11", comments="Load time: 1.25s (median of 3)")]
+        paginated = os.path.join(self.directory, "attendance_test_results_20260101_090000.html")
+        write_html_report(paginated, lambda: iter(results))
+        table = os.path.join(self.directory, "attendance_test_results_20260102_090000.html")
+        with open(table, "w", encoding="utf-8") as file:
+            file.write("<table><tr><th>Test ID</th></tr>"
+                       "<tr><td>TC_01</td><td>Page Loading Test</td><td>FAIL</td><td>2026-01-02</td><td></td></tr></table>")
+        self.assertEqual(self.index.ingest_paths([paginated, table]), 3)
+        self.assertEqual([row[3:] for row in self.rows()], [("TC_01", "PASS"), ("TC_11", "PASS"), ("TC_01", "FAIL")])
+        self.assertEqual(self.index.load_time_trend("TC_11"), [("2026-01-01 09:00:00", 1.25, "PASS")])
+
+    def test_flakiest_counts_status_flips_in_run_order(self):
+        for day, statuses in enumerate([("PASS", "PASS"), ("FAIL", "PASS"), ("PASS", "PASS"), ("PASS", "FAIL")], 1):
+            self.write_run(f"202601{day:02d}_090000", [result("TC_01", statuses[0]), result("TC_02", statuses[1])])
+        self.index.ingest_paths([self.directory])
+        self.assertEqual(self.index.flakiest(), [("TC_01", 4, 2, 2 / 3, 0.25), ("TC_02", 4, 1, 1 / 3, 0.25)])
+        self.assertEqual(self.index.pass_rate("TC_02", "month"), [("TC_02", "2026-01", 4, 0.75)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#cd tests
+#python -m unittest test_validation
+import json
+import shutil
+import subprocess
+import unittest
+from local_server import LocalAttendanceServer
+from roster_generator import RosterGenerator
+from validation import (
+    INVALID_EMAIL, INVALID_LOCATION, JS_WHITESPACE, MESSAGES, MISSING_IDENTITY, MISSING_LOCATION,
+    fuzz_records, validate_batch, validate_columns, validate_record,
+)
+
+FUZZ_COUNT = 20000
+
+# Runs the form's own validateAttendance over JSON records on stdin, trimming fields as submitAttendance does
+NODE_HARNESS = """
+%(script)s
+var records = JSON.parse(require("fs").readFileSync(0, "utf8"));
+var results = records.map(function (record) {
+    var data = {};
+    Object.keys(record).forEach(function (key) { data[key] = record[key].trim(); });
+    return validateAttendance(data);
+});
+process.stdout.write(JSON.stringify(results));
+"""
+
+
+def form_validation_script():
+    """The validation part of the stand-in form's inline script"""
+    with LocalAttendanceServer() as server:
+        page = server.httpd.form_page
+    start = page.index("var EMAIL_PATTERN")
+    return page[start:page.index("function setStatus", start)]
+
+
+class ValidationEngineTests(unittest.TestCase):
+
+    def test_known_cases(self):
+        # The inputs the Selenium suite submits (TC_04, TC_08, TC_09, TC_10)
+        valid = {"Email": "john.123@example.com", "Name": "John Smith", "Latitude": "12.9716", "Longitude": "77.5946"}
+        self.assertIsNone(validate_record(valid))
+        self.assertEqual(validate_record({**valid, "Email": "invalid-email"}), INVALID_EMAIL)
+        self.assertEqual(validate_record({**valid, "Name": ""}), MISSING_IDENTITY)
+        self.assertEqual(validate_record({**valid, "Latitude": "999", "Longitude": "999"}), INVALID_LOCATION)
+        self.assertEqual(validate_record({**valid, "Latitude": ""}), MISSING_LOCATION)
+        self.assertEqual(validate_record({}), MISSING_IDENTITY)
+
+    def test_batch_matches_scalar(self):
+        records = list(fuzz_records(FUZZ_COUNT, seed=1))
+        # Without newlines in the values the batch takes its joined-column path, with them the per-row one
+        single_line = [record for record in records if "\n" not in "".join(record.values())]
+        for sample in (records, single_line):
+            expected = [validate_record(record) for record in sample]
+            columns = {name: [record[name] for record in sample] for name in ("Email", "Name", "Latitude", "Longitude")}
+            self.assertEqual(validate_columns(columns), expected)
+
+    def test_surrounding_whitespace_is_ignored(self):
+        for index, record in enumerate(fuzz_records(FUZZ_COUNT, seed=2)):
+            padding = JS_WHITESPACE[index % len(JS_WHITESPACE)]
+            padded = {name: padding + value + padding for name, value in record.items()}
+            self.assertEqual(validate_record(padded), validate_record(record), padded)
+
+    def test_accepted_records_are_in_range(self):
+        for record in fuzz_records(FUZZ_COUNT, seed=3):
+            if validate_record(record) is None:
+                self.assertEqual(record["Email"].strip(JS_WHITESPACE).count("@"), 1, record)
+                self.assertLessEqual(abs(float(record["Latitude"].strip(JS_WHITESPACE))), 90, record)
+                self.assertLessEqual(abs(float(record["Longitude"].strip(JS_WHITESPACE))), 180, record)
+
+    def test_roster_invalid_rows_are_rejected(self):
+        columns = RosterGenerator(students=500, seed=4, invalid_rate=0.2).chunk(0, 0, 5000)
+        codes = validate_batch(columns["Email"], columns["Name"], columns["Latitude"], columns["Longitude"])
+        for email, name, latitude, code in zip(columns["Email"], columns["Name"], columns["Latitude"], codes):
+            if email == "invalid-email":
+                self.assertEqual(code, INVALID_EMAIL)
+            elif not name:
+                self.assertEqual(code, MISSING_IDENTITY)
+            elif latitude == "999":
+                self.assertEqual(code, INVALID_LOCATION)
+            else:
+                self.assertIsNone(code)
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_matches_form_script(self):
+        # The stand-in's script is generated from validation.py, so this checks that the Python and JS
+        # regex dialects agree, not that the deployed form behaves the same
+        records = list(fuzz_records(FUZZ_COUNT, seed=5))
+        result = subprocess.run(
+            ["node", "-e", NODE_HARNESS % {"script": form_validation_script()}],
+            input=json.dumps(records), capture_output=True, text=True, check=True,
+        )
+        form_messages = json.loads(result.stdout)
+        for record, message in zip(records, form_messages):
+            code = validate_record(record)
+            self.assertEqual(message, MESSAGES[code] if code else None, record)
+
+
+if __name__ == "__main__":
+    unittest.main()
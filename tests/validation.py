@@ -0,0 +1,188 @@
+#cd tests
+#python validation.py --rows 1000000
+"""Submission rules of the local stand-in (local_server.py), which builds its form script and
+backend checks from this module.
+
+They are not taken from the deployed form: src/exampleform.html and code.gs are empty in this
+repository, and runs against the deployed app never show these messages. Parity with the real
+form has not been verified."""
+import argparse
+import random
+import re
+import time
+from collections import Counter
+from itertools import compress, count, filterfalse, repeat
+from operator import lt, methodcaller, not_
+
+# Error codes, in the order the stand-in form checks them, and the status message shown for each
+MISSING_IDENTITY = "missing_identity"
+INVALID_EMAIL = "invalid_email"
+MISSING_LOCATION = "missing_location"
+INVALID_LOCATION = "invalid_location"
+
+MESSAGES = {
+    MISSING_IDENTITY: "Please enter both Email and Name.",
+    INVALID_EMAIL: "Please enter a valid email address.",
+    MISSING_LOCATION: "Please capture your location first.",
+    INVALID_LOCATION: "Invalid location coordinates.",
+}
+
+# Keyword the Selenium tests look for in #status for each error
+STATUS_KEYWORDS = {
+    MISSING_IDENTITY: ("email", "name"),
+    INVALID_EMAIL: ("email",),
+    MISSING_LOCATION: ("location",),
+    INVALID_LOCATION: ("location",),
+}
+
+# Characters String.prototype.trim() and the JS \s class treat as whitespace. Python's
+# str.strip() and re's \s use a different set, so both are spelled out to match the stand-in form.
+JS_WHITESPACE = (
+    "\t\n\x0b\x0c\r \xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    "\u2028\u2029\u202f\u205f\u3000\ufeff"
+)
+
+# Patterns in the syntax shared by Python and JS; anchored with ^...$ on the JS side
+JS_EMAIL_PATTERN = r"[^\s@]+@[^\s@]+\.[^\s@]+"
+NUMBER_PATTERN = r"[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?"
+
+_NOT_SPACE_OR_AT = "[^@" + re.escape(JS_WHITESPACE) + "]+"
+_email_match = re.compile(rf"{_NOT_SPACE_OR_AT}@{_NOT_SPACE_OR_AT}\.{_NOT_SPACE_OR_AT}").fullmatch
+_number_match = re.compile(NUMBER_PATTERN).fullmatch
+
+# Characters a number can be made of, for validate_batch's float() fast path
+_NUMBER_CHARS = b"0123456789eE.+-"
+
+
+def validate_fields(email, name, latitude, longitude):
+    """Error code for one submission, or None if the stand-in form and backend would accept it"""
+    email = email.strip(JS_WHITESPACE)
+    if not email or not name.strip(JS_WHITESPACE):
+        return MISSING_IDENTITY
+    if not _email_match(email):
+        return INVALID_EMAIL
+    latitude = latitude.strip(JS_WHITESPACE)
+    longitude = longitude.strip(JS_WHITESPACE)
+    if not latitude or not longitude:
+        return MISSING_LOCATION
+    if not _number_match(latitude) or not _number_match(longitude):
+        return INVALID_LOCATION
+    if not -90 <= float(latitude) <= 90 or not -180 <= float(longitude) <= 180:
+        return INVALID_LOCATION
+    return None
+
+
+def validate_record(record):
+    return validate_fields(
+        record.get("Email", ""), record.get("Name", ""), record.get("Latitude", ""), record.get("Longitude", "")
+    )
+
+
+def coordinates(record):
+    """(latitude, longitude) as floats, trimmed like the stand-in form does; only for records validate_record accepts"""
+    return float(record["Latitude"].strip(JS_WHITESPACE)), float(record["Longitude"].strip(JS_WHITESPACE))
+
+
+def _flagged(flags):
+    """Indexes of the truthy flags"""
+    return compress(count(), flags)
+
+
+def _bad_numbers(values, limit):
+    """Rows that are not a plain number within +/-limit"""
+    try:
+        if "".join(values).encode("ascii").translate(None, _NUMBER_CHARS):
+            raise ValueError
+        # Only number characters, so float() accepts exactly what NUMBER_PATTERN does
+        numbers = list(map(float, values))
+        rows = []
+    except (ValueError, UnicodeEncodeError):
+        rows = list(_flagged(map(not_, map(_number_match, values))))
+        numbers = list(values)
+        for row in rows:
+            numbers[row] = "0"
+        numbers = list(map(float, numbers))
+    if numbers and (min(numbers) < -limit or max(numbers) > limit):
+        rows.extend(_flagged(map(lt, repeat(limit), map(abs, numbers))))
+    return rows
+
+
+def validate_batch(emails, names, latitudes, longitudes):
+    """Column-wise validation (e.g. a roster_generator chunk); returns one code or None per row.
+
+    Each column is screened with C-level map() pipelines; only the rows flagged there (bad or
+    merely padded with whitespace) go through validate_fields."""
+    # Emails and names repeat across a roster's days, so each distinct value is checked once
+    bad_emails = set(filterfalse(_email_match, set(emails)))
+    blank_names = set(filterfalse(methodcaller("strip", JS_WHITESPACE), set(names)))
+    suspect = set(_flagged(map(bad_emails.__contains__, emails)))
+    suspect.update(_flagged(map(blank_names.__contains__, names)))
+    suspect.update(_bad_numbers(latitudes, 90.0))
+    suspect.update(_bad_numbers(longitudes, 180.0))
+    codes = [None] * len(emails)
+    for row in suspect:
+        codes[row] = validate_fields(emails[row], names[row], latitudes[row], longitudes[row])
+    return codes
+
+
+def validate_columns(columns):
+    """validate_batch over a {column: list} chunk with the TEST_STUDENTS column names"""
+    return validate_batch(columns["Email"], columns["Name"], columns["Latitude"], columns["Longitude"])
+
+
+# Building blocks for fuzzed inputs: the tests' own values plus the edge cases the rules hinge on
+_FUZZ_EMAILS = ["john.123@example.com", "jane.doe@work.net", "invalid-email", "a@b.c", "a@b", "@b.co", "a@.co",
+                "a@b.co.", "a b@c.de", "a@@b.co", "a@b.co\n", "\ufeffa@b.co", "a\u200b@b.co", "a\x1c@b.co", ""]
+_FUZZ_NAMES = ["John Smith", "", " ", "\xa0", "\u3000", "\x85", "\x1f", "\u00dcn\u00efc\u00f6d\u00e9", "0"]
+_FUZZ_NUMBERS = ["12.9716", "77.5946", "999", "-999", "90", "-90", "180", "-180", "90.0001", "1e1", "1e3", ".5",
+                 "5.", "+5", "--5", "0x10", "12abc", "nan", "inf", "Infinity", "1_0", "\u0661\u0662", "", " ", "1 2"]
+
+
+def fuzz_value(rng, pool):
+    value = rng.choice(pool)
+    roll = rng.random()
+    if roll < 0.15:
+        return rng.choice(JS_WHITESPACE) + value + rng.choice(JS_WHITESPACE)
+    if roll < 0.25:
+        return "".join(rng.choice(value + "@. \t-+e0123456789") for _ in range(rng.randrange(8)))
+    if roll < 0.3:
+        return str(rng.uniform(-200, 200))
+    return value
+
+
+def fuzz_records(count, seed=0):
+    """Generate `count` form submissions mixing valid values, edge cases and random mutations"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield {
+            "Email": fuzz_value(rng, _FUZZ_EMAILS),
+            "Name": fuzz_value(rng, _FUZZ_NAMES),
+            "Latitude": fuzz_value(rng, _FUZZ_NUMBERS),
+            "Longitude": fuzz_value(rng, _FUZZ_NUMBERS),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the validation engine on a synthetic roster and fuzzed input")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--fuzz", type=int, default=100000, help="Fuzzed records to validate")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from roster_generator import RosterGenerator
+    columns = RosterGenerator(students=args.students, seed=args.seed).chunk(0, 0, args.rows)
+    start_time = time.perf_counter()
+    codes = validate_columns(columns)
+    elapsed = time.perf_counter() - start_time
+    print(f"Roster: {args.rows} rows in {elapsed:.2f}s ({args.rows / elapsed:,.0f} rows/s) {dict(Counter(codes))}")
+
+    records = list(fuzz_records(args.fuzz, args.seed))
+    start_time = time.perf_counter()
+    codes = [validate_record(record) for record in records]
+    elapsed = time.perf_counter() - start_time
+    print(f"Fuzz: {args.fuzz} records in {elapsed:.2f}s ({args.fuzz / elapsed:,.0f} records/s) {dict(Counter(codes))}")
+
+
+if __name__ == "__main__":
+    main()
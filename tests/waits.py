@@ -0,0 +1,108 @@
+import time
+from contextlib import nullcontext
+
+# Resolves as soon as #status shows a new message (and one of the expected markers, if given)
+STATUS_SCRIPT = """
+var previous = arguments[0], expected = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var status = document.getElementById("status");
+if (!status) { done([false, ""]); return; }
+function currentText() { return status.innerText.trim(); }
+function satisfied(text) {
+    if (text === previous || text === "") { return false; }
+    if (!expected || !expected.length) { return true; }
+    var lower = text.toLowerCase();
+    return expected.some(function (marker) { return lower.indexOf(marker) !== -1; });
+}
+if (satisfied(currentText())) { done([true, currentText()]); return; }
+var observer = new MutationObserver(function () { if (satisfied(currentText())) { finish(true); } });
+var timer = setTimeout(function () { finish(false); }, timeoutMs);
+function finish(ok) { observer.disconnect(); clearTimeout(timer); done([ok, currentText()]); }
+observer.observe(status, { childList: true, characterData: true, subtree: true });
+"""
+
+# Input values set from script do not fire DOM events, so poll them inside the page instead
+LOCATION_SCRIPT = """
+var timeoutMs = arguments[0], done = arguments[arguments.length - 1];
+var started = Date.now();
+function values() {
+    var lat = document.getElementById("Latitude"), lng = document.getElementById("Longitude");
+    return [lat ? lat.value : "", lng ? lng.value : ""];
+}
+(function check() {
+    var current = values();
+    if (current[0] !== "" && current[1] !== "") { done([true, current]); return; }
+    if (Date.now() - started >= timeoutMs) { done([false, current]); return; }
+    setTimeout(check, 25);
+})();
+"""
+
+STATUS_TEXT_SCRIPT = """
+var status = document.getElementById("status");
+return status ? status.innerText.trim() : "";
+"""
+
+
+class FormWaits:
+    """Event-driven waits on the attendance form that record how long each wait took"""
+
+    TIMEOUTS = {"status": 10, "location": 10}
+
+    def __init__(self, driver, timings=None, timeouts=None, tracer=None):
+        self.driver = driver
+        # A CommandTracer records each wait as a "wait" span around its execute_async_script
+        self.tracer = tracer
+        self.timings = timings if timings is not None else []
+        self.timeouts = dict(self.TIMEOUTS, **(timeouts or {}))
+        self.test_id = ""
+        self._script_timeout = None
+
+    def status_text(self):
+        return self.driver.execute_script(STATUS_TEXT_SCRIPT)
+
+    def status_changed(self, previous, expected=None, timeout=None):
+        """Wait for #status to differ from `previous`; returns the status text either way"""
+        timeout = timeout or self.timeouts["status"]
+        markers = [marker.lower() for marker in expected or []]
+        _, text = self._run("status", timeout, STATUS_SCRIPT, previous, markers, int(timeout * 1000))
+        return text
+
+    def status_after(self, action, expected=None, timeout=None):
+        """Perform `action` (e.g. a button click) and wait for the status message it produces"""
+        previous = self.status_text()
+        action()
+        return self.status_changed(previous, expected, timeout)
+
+    def location_filled(self, timeout=None):
+        """Wait for Latitude and Longitude to be filled; returns their values either way"""
+        timeout = timeout or self.timeouts["location"]
+        _, values = self._run("location", timeout, LOCATION_SCRIPT, int(timeout * 1000))
+        return tuple(values)
+
+    def _run(self, condition, timeout, script, *args):
+        # The in-page timer fires first; the driver's script timeout is only a backstop
+        if self._script_timeout is None or self._script_timeout < timeout + 5:
+            self._script_timeout = timeout + 5
+            self.driver.set_script_timeout(self._script_timeout)
+        start_time = time.perf_counter()
+        span = self.tracer.span(f"FormWaits.{condition}", "wait", condition) if self.tracer else nullcontext()
+        with span:
+            satisfied, value = self.driver.execute_async_script(script, *args)
+        self.timings.append({
+            "Test": self.test_id,
+            "Condition": condition,
+            "Timeout": timeout,
+            "Elapsed": time.perf_counter() - start_time,
+            "Satisfied": satisfied,
+        })
+        return satisfied, value
+
+    def summary(self):
+        by_condition = {}
+        for timing in self.timings:
+            stats = by_condition.setdefault(timing["Condition"], {"count": 0, "total": 0.0, "max": 0.0, "timeouts": 0})
+            stats["count"] += 1
+            stats["total"] += timing["Elapsed"]
+            stats["max"] = max(stats["max"], timing["Elapsed"])
+            stats["timeouts"] += 0 if timing["Satisfied"] else 1
+        return by_condition